@@ -0,0 +1,355 @@
+"""Benchmarks for curtsies formatted strings and rendering
+
+Runs without a terminal: windows render to an in-memory VirtualTerminal by
+default, or to a pseudo-terminal with --backend pty. Results are printed as
+a table, or as JSON with --json for comparing runs over time.
+
+    python benchmarks/benchmark.py
+    python benchmarks/benchmark.py --json results.json render
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import curtsies
+from curtsies.fmtfuncs import blue, bold, green, on_red, red
+from curtsies.formatstring import FmtStr, fmtstr, linesplit
+from curtsies.formatstringarray import FSArray
+from curtsies.virtualterminal import VirtualTerminal
+from curtsies.window import FullscreenWindow, OutputBackend
+
+ROWS, COLUMNS = 24, 80
+
+Run = Callable[[], None]
+Setup = Callable[[OutputBackend], Run]
+
+BENCHMARKS: dict[str, Setup] = {}
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """Registers a function which prepares a benchmark and returns the
+    operation to time, given the backend windows should render to"""
+
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+class PtyBackend(OutputBackend):
+    """Writes to a pseudo-terminal, whose output is read and thrown away"""
+
+    def __init__(self, rows: int, columns: int) -> None:
+        self.rows, self.columns = rows, columns
+        self.master, self.slave = os.openpty()
+        self.bytes_written = self.writes = self.escape_sequences = 0
+        threading.Thread(target=self._drain, daemon=True).start()
+
+    def _drain(self) -> None:
+        try:
+            while os.read(self.master, 65536):
+                pass
+        except OSError:
+            pass
+
+    def write(self, data: str) -> None:
+        encoded = data.encode("utf8")
+        self.writes += 1
+        self.bytes_written += len(encoded)
+        self.escape_sequences += data.count("\x1b")
+        while encoded:
+            encoded = encoded[os.write(self.slave, encoded) :]
+
+    def reset_counts(self) -> None:
+        self.bytes_written = self.writes = self.escape_sequences = 0
+
+    def close(self) -> None:
+        os.close(self.slave)
+        os.close(self.master)
+
+    def get_size(self) -> tuple[int, int]:
+        return self.rows, self.columns
+
+
+def paragraph(words: int) -> FmtStr:
+    colors = itertools.cycle([red, blue, green, bold])
+    return fmtstr(" ").join(
+        next(colors)(word)
+        for word in itertools.islice(
+            itertools.cycle("lorem ipsum dolor sit amet consectetur".split()), words
+        )
+    )
+
+
+@benchmark("fmtstr_construction")
+def fmtstr_construction(backend: OutputBackend) -> Run:
+    counter = itertools.count()
+
+    def run() -> None:
+        fmtstr("hello %d" % (next(counter) % 1000), "red", bold=True)
+
+    return run
+
+
+@benchmark("fmtstr_concatenation")
+def fmtstr_concatenation(backend: OutputBackend) -> Run:
+    hello, there, you = red("hello"), blue("there"), green(on_red("you"))
+
+    def run() -> None:
+        hello + " " + there + " " + you
+
+    return run
+
+
+@benchmark("fmtstr_slicing")
+def fmtstr_slicing(backend: OutputBackend) -> Run:
+    s = paragraph(40)
+
+    def run() -> None:
+        s[17:150]
+
+    return run
+
+
+@benchmark("fmtstr_splicing")
+def fmtstr_splicing(backend: OutputBackend) -> Run:
+    s = paragraph(40)
+    new = blue("spliced")
+
+    def run() -> None:
+        s.splice(new, 30, 60)
+
+    return run
+
+
+@benchmark("fmtstr_from_str")
+def fmtstr_from_str(backend: OutputBackend) -> Run:
+    s = str(paragraph(40))
+
+    def run() -> None:
+        FmtStr.from_str(s)
+
+    return run
+
+
+@benchmark("fsarray_assignment")
+def fsarray_assignment(backend: OutputBackend) -> Run:
+    arr = FSArray(ROWS, COLUMNS)
+    line = [blue("x" * 10)]
+    counter = itertools.count()
+
+    def run() -> None:
+        i = next(counter)
+        row, column = i % ROWS, i % (COLUMNS - 10)
+        arr[row, column : column + 10] = line
+
+    return run
+
+
+@benchmark("width_aware_splitlines")
+def width_aware_splitlines(backend: OutputBackend) -> Run:
+    s = paragraph(200) + fmtstr(" ｆｕｌｌｗｉｄｔｈ")
+
+    def run() -> None:
+        list(s.width_aware_splitlines(COLUMNS))
+
+    return run
+
+
+@benchmark("linesplit")
+def linesplit_paragraph(backend: OutputBackend) -> Run:
+    s = paragraph(200)
+
+    def run() -> None:
+        linesplit(s, COLUMNS)
+
+    return run
+
+
+def rendering(backend: OutputBackend, frames: Iterator[list[FmtStr]]) -> Run:
+    window = FullscreenWindow(backend=backend, hide_cursor=False)
+
+    def run() -> None:
+        window.render_to_terminal(next(frames))
+
+    return run
+
+
+@benchmark("render_all_different")
+def render_all_different(backend: OutputBackend) -> Run:
+    def frames() -> Iterator[list[FmtStr]]:
+        for i in itertools.count():
+            c = "qwertyuiop"[i % 10]
+            yield [blue(on_red(c * COLUMNS)) for _ in range(ROWS)]
+
+    return rendering(backend, frames())
+
+
+@benchmark("render_all_identical")
+def render_all_identical(backend: OutputBackend) -> Run:
+    def frames() -> Iterator[list[FmtStr]]:
+        while True:
+            yield [blue(on_red("q" * COLUMNS)) for _ in range(ROWS)]
+
+    return rendering(backend, frames())
+
+
+@benchmark("render_single_cell_change")
+def render_single_cell_change(backend: OutputBackend) -> Run:
+    def frames() -> Iterator[list[FmtStr]]:
+        a = [blue(on_red("q" * COLUMNS)) for _ in range(ROWS)]
+        for i in itertools.count():
+            cell = i % (ROWS * COLUMNS)
+            row, column = divmod(cell, COLUMNS)
+            a = list(a)
+            a[row] = a[row].setitem(column, "x" if a[row].s[column] == "q" else "q")
+            yield a
+
+    return rendering(backend, frames())
+
+
+def make_backend(kind: str) -> Any:
+    if kind == "pty":
+        return PtyBackend(ROWS, COLUMNS)
+    return VirtualTerminal(ROWS, COLUMNS, emulate=False)
+
+
+def time_benchmark(
+    name: str, backend_kind: str, min_time: float, alloc_iterations: int
+) -> dict[str, Any]:
+    setup = BENCHMARKS[name]
+    backend = make_backend(backend_kind)
+    try:
+        run = setup(backend)
+        for _ in range(10):
+            run()
+
+        # double the iterations until a run takes long enough to time reliably
+        iterations = 10
+        while True:
+            backend.reset_counts()
+            start = time.perf_counter()
+            for _ in range(iterations):
+                run()
+            seconds = time.perf_counter() - start
+            if seconds >= min_time:
+                break
+            iterations *= 2
+        bytes_written = backend.bytes_written
+        writes = backend.writes
+        escape_sequences = backend.escape_sequences
+
+        # allocations are measured separately since tracing slows everything down
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        snapshot_before = tracemalloc.take_snapshot()
+        for _ in range(alloc_iterations):
+            run()
+        snapshot_after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        if isinstance(backend, PtyBackend):
+            backend.close()
+    stats = snapshot_after.compare_to(snapshot_before, "filename")
+    allocated_blocks = sum(max(0, stat.count_diff) for stat in stats)
+
+    return {
+        "name": name,
+        "iterations": iterations,
+        "seconds": seconds,
+        "ops_per_second": iterations / seconds,
+        "microseconds_per_op": seconds / iterations * 1e6,
+        "bytes_written_per_op": bytes_written / iterations,
+        "writes_per_op": writes / iterations,
+        "escape_sequences_per_op": escape_sequences / iterations,
+        "peak_traced_bytes": peak - before,
+        "retained_blocks_per_op": allocated_blocks / alloc_iterations,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "patterns", nargs="*", help="only run benchmarks whose names match"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["virtual", "pty"],
+        default="virtual",
+        help="what windows render to (default: virtual)",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="seconds each benchmark runs for at least (default: 0.2)",
+    )
+    parser.add_argument(
+        "--alloc-iterations",
+        type=int,
+        default=100,
+        help="iterations traced to measure allocations (default: 100)",
+    )
+    parser.add_argument(
+        "--json", metavar="FILE", help="write results as JSON to FILE, - for stdout"
+    )
+    parser.add_argument("--list", action="store_true", help="list benchmarks")
+    args = parser.parse_args()
+
+    names = [
+        name
+        for name in BENCHMARKS
+        if not args.patterns or any(re.search(p, name) for p in args.patterns)
+    ]
+    if args.list:
+        print("\n".join(names))
+        return
+
+    results = []
+    for name in names:
+        result = time_benchmark(
+            name, args.backend, args.min_time, args.alloc_iterations
+        )
+        results.append(result)
+        if args.json != "-":
+            print(
+                "{name:28} {microseconds_per_op:10.2f} us/op {ops_per_second:12.0f} ops/s "
+                "{bytes_written_per_op:9.0f} B/op {peak_traced_bytes:9d} B peak".format(
+                    **result
+                )
+            )
+
+    if args.json:
+        report = {
+            "curtsies": curtsies.__version__,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "backend": args.backend,
+            "rows": ROWS,
+            "columns": COLUMNS,
+            "results": results,
+        }
+        if args.json == "-":
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@
 __version__ = "0.4.3"
 
 from .window import FullscreenWindow, CursorAwareWindow
-from .input import Input
+from .input import Input, AsyncInput
 from .termhelpers import Nonblocking, Cbreak, Termmode
 from .formatstring import FmtStr, fmtstr
 from .formatstringarray import FSArray, fsarray
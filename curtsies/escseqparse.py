@@ -31,9 +31,9 @@ from .termformatconstants import (
     RESET_FG,
     RESET_BG,
     STYLES,
+    STYLE_RESETS,
 )
 
-
 Token = dict[str, Union[str, list[int]]]
 
 
@@ -53,26 +53,54 @@ def parse(s: str) -> list[str | dict[str, str | bool | None]]:
     [{'fg': 'yellow'}, '[', {'fg': None}, {'fg': 'yellow'}, ']', {'fg': None}, {'fg': 'yellow'}, '[', {'fg': None}, {'fg': 'yellow'}, ']', {'fg': None}, {'fg': 'yellow'}, '[', {'fg': None}, {'fg': 'yellow'}, ']', {'fg': None}, {'fg': 'yellow'}, '[', {'fg': None}]
     """
     stuff: list[str | dict[str, str | bool | None]] = []
-    rest = s
-    while True:
-        front, token, rest = peel_off_esc_code(rest)
+    pos = 0
+    for m in _ESC_SEQ.finditer(s):
+        front = s[pos : m.start()]
         if front:
             stuff.append(front)
-        if token:
-            try:
-                tok = token_type(token)
-                if tok:
-                    stuff.extend(tok)
-            except ValueError:
-                raise ValueError(
-                    "Can't parse escape sequence: %r %r %r %r"
-                    % (s, repr(front), token, repr(rest))
-                )
-        if not rest:
-            break
+        pos = m.end()
+        token = _token_from_match(m)
+        try:
+            tok = token_type(token)
+            if tok:
+                stuff.extend(tok)
+        except ValueError:
+            raise ValueError(
+                "Can't parse escape sequence: %r %r %r %r"
+                % (s, repr(front), token, repr(s[pos:]))
+            )
+    if s[pos:]:
+        stuff.append(s[pos:])
     return stuff
 
 
+# CSI sequences first so ESC [ is only read as a two byte sequence
+# when it doesn't start a valid CSI sequence
+# fmt: off
+_ESC_SEQ = re.compile(
+    r"(?P<csi>\x1b\[|\x9b)"
+    r"(?P<private>)"
+    r"(?P<numbers>(?:\d+;)*(?:\d+)?)"
+    r"(?P<intermed>[\x20-\x2f]*)"
+    r"(?P<command>[\x40-\x7e])"
+    r"|"
+    r"(?P<esc>\x1b)(?P<esc_command>[\x40-\x5f])"
+)
+# fmt: on
+
+
+def _token_from_match(m: Match[str]) -> Token:
+    if m.group("esc") is not None:
+        return {"csi": m.group("esc"), "command": m.group("esc_command"), "seq": m[0]}
+    d: dict[str, Any] = m.groupdict()
+    del d["esc"]
+    del d["esc_command"]
+    d["seq"] = m[0]
+    if all(d["numbers"].split(";")):
+        d["numbers"] = [int(x) for x in d["numbers"].split(";")]
+    return cast(Token, d)
+
+
 def peel_off_esc_code(s: str) -> tuple[str, Token | None, str]:
     r"""Returns processed text, the next token, and unprocessed text
 
@@ -82,47 +110,10 @@ def peel_off_esc_code(s: str) -> tuple[str, Token | None, str]:
     >>> d == {'numbers': [2], 'command': 'A', 'intermed': '', 'private': '', 'csi': '\x1b[', 'seq': '\x1b[2A'}
     True
     """
-    # fmt: off
-    p = r"""(?P<front>.*?)
-            (?P<seq>
-                (?P<csi>
-                    (?:[]\[)
-                    |
-                    ["""+'\x9b' + r"""])
-                (?P<private>)
-                (?P<numbers>
-                    (?:\d+;)*
-                    (?:\d+)?)
-                (?P<intermed>""" + '[\x20-\x2f]*)' + r"""
-                (?P<command>""" + '[\x40-\x7e]))' + r"""
-            (?P<rest>.*)"""
-    # fmt: on
-    m1 = re.match(p, s, re.VERBOSE)  # multibyte esc seq
-    m2 = re.match(
-        "(?P<front>.*?)(?P<seq>(?P<csi>)(?P<command>[\x40-\x5f]))(?P<rest>.*)", s
-    )  # 2 byte escape sequence
-    m = None  # Optional[Match[str]]
-    if m1 and m2:
-        m = m1 if len(m1.groupdict()["front"]) <= len(m2.groupdict()["front"]) else m2
-        # choose the match which has less processed text in order to get the
-        # first escape sequence
-    elif m1:
-        m = m1
-    elif m2:
-        m = m2
-    else:
-        m = None
-
-    if m:
-        d: dict[str, Any] = m.groupdict()
-        del d["front"]
-        del d["rest"]
-        if "numbers" in d and all(d["numbers"].split(";")):
-            d["numbers"] = [int(x) for x in d["numbers"].split(";")]
-
-        return m.groupdict()["front"], cast(Token, d), m.groupdict()["rest"]
-    else:
+    m = _ESC_SEQ.search(s)
+    if m is None:
         return s, None, ""
+    return s[: m.start()], _token_from_match(m), s[m.end() :]
 
 
 def token_type(info: Token) -> list[dict[str, str | bool | None]] | None:
@@ -146,6 +137,10 @@ def token_type(info: Token) -> list[dict[str, str | bool | None]] | None:
                 tokens.append({"fg": None})
             if value == RESET_BG:
                 tokens.append({"bg": None})
+            if value in STYLE_RESETS.values():
+                tokens.append(
+                    {k: None for k, reset in STYLE_RESETS.items() if reset == value}
+                )
 
         if tokens:
             return tokens
@@ -2,10 +2,11 @@
 
 import codecs
 import itertools
+import re
 import sys
 from enum import Enum, auto
 from typing import Optional, List, Union
-from collections.abc import Sequence
+from collections.abc import Mapping, Sequence
 
 from .termhelpers import Termmode
 from .curtsieskeys import CURTSIES_NAMES as special_curtsies_names
@@ -69,8 +70,12 @@ CURSES_NAMES = {
     b"\x1b[OH": "KEY_HOME",  # home   (7)
 }
 
+# bracketed paste mode markers, sent by terminals before and after pasted text
+PASTE_START = b"\x1b[200~"
+PASTE_END = b"\x1b[201~"
+
 KEYMAP_PREFIXES = set()
-for table in (CURSES_NAMES, CURTSIES_NAMES):
+for table in (CURSES_NAMES, CURTSIES_NAMES, (PASTE_START, PASTE_END)):
     for k in table:
         if k.startswith(b"\x1b"):
             for i in range(1, len(k)):
@@ -139,11 +144,61 @@ class SigIntEvent(Event):
 class PasteEvent(Event):
     """Multiple keypress events combined, likely from copy/paste.
 
-    The events attribute contains a list of keypress event strings.
+    The events attribute contains a list of keypress event strings, and
+    the text attribute the pasted text. Runs of pasted characters are
+    stored as text and only split into keypresses when events is used:
+    each character is the keypress named char_keys.get(char, char).
+
+    >>> paste = PasteEvent({' ': '<SPACE>'})
+    >>> paste.add_text('hi there')
+    >>> paste.add_key('<UP>', '\\x1b[A')
+    >>> paste.text
+    'hi there\\x1b[A'
+    >>> paste.events
+    ['h', 'i', '<SPACE>', 't', 'h', 'e', 'r', 'e', '<UP>']
     """
 
-    def __init__(self) -> None:
-        self.events: list[str] = []
+    def __init__(self, char_keys: Mapping[str, str] | None = None) -> None:
+        self.char_keys: Mapping[str, str] = {} if char_keys is None else char_keys
+        # (text, None) for a run of characters, (text, key) for a single key
+        self._segments: list[tuple[str, str | None]] = []
+        self._events: list[str] | None = None
+
+    def add_text(self, text: str) -> None:
+        """Adds pasted characters, each of which is a keypress"""
+        self._segments.append((text, None))
+        if self._events is not None:
+            self._events.extend([self.char_keys.get(c, c) for c in text])
+
+    def add_key(self, key: str, text: str = "") -> None:
+        """Adds a keypress, text being the characters it was sent as"""
+        self._segments.append((text, key))
+        if self._events is not None:
+            self._events.append(key)
+
+    @property
+    def events(self) -> list[str]:
+        if self._events is None:
+            self._events = []
+            for text, key in self._segments:
+                if key is None:
+                    self._events.extend([self.char_keys.get(c, c) for c in text])
+                else:
+                    self._events.append(key)
+        return self._events
+
+    @events.setter
+    def events(self, events: list[str]) -> None:
+        self._segments = [(e if isinstance(e, str) else "", e) for e in events]
+        self._events = events
+
+    @property
+    def text(self) -> str:
+        """Pasted characters, including those of keys like <UP>
+
+        Keys added by appending to events rather than with add_key aren't
+        included."""
+        return "".join(text for text, _ in self._segments)
 
     def __repr__(self) -> str:
         return "<Paste Event with data: %r>" % self.events
@@ -153,6 +208,25 @@ class PasteEvent(Event):
         return repr(self)
 
 
+class PasteChunkEvent(PasteEvent):
+    """Part of a bracketed paste too long to be returned as one event
+
+    Returned by an Input with a paste_chunk_size, in order, until one
+    with final set ends the paste."""
+
+    def __init__(
+        self, char_keys: Mapping[str, str] | None = None, final: bool = False
+    ) -> None:
+        super().__init__(char_keys)
+        self.final = final
+
+    def __repr__(self) -> str:
+        return "<Paste Chunk Event%s with data: %r>" % (
+            " (final)" if self.final else "",
+            self.events,
+        )
+
+
 def decodable(seq: bytes, encoding: str) -> bool:
     try:
         u = seq.decode(encoding)
@@ -279,6 +353,167 @@ def could_be_unfinished_utf8(seq: bytes) -> bool:
     )
 
 
+# bytes of plain text, which can be decoded many characters at a time
+_UTF8_TEXT = re.compile(b"[^\x1b]+")
+_ASCII_TEXT = re.compile(b"[\x00-\x1a\x1c-\x7f]+")
+
+
+class _KeyNode:
+    """Node of the trie of named key sequences"""
+
+    __slots__ = ("children", "named")
+
+    def __init__(self) -> None:
+        self.children: dict[int, _KeyNode] = {}
+        self.named = False
+
+
+class KeyDecoder:
+    """Splits bytes read from a terminal into keypresses
+
+    Gives the same keys as calling get_key on progressively longer
+    sequences, but walks a trie of the named key sequences so each byte is
+    looked at once. Plain ASCII and complete UTF-8 characters are decoded
+    without consulting the trie at all.
+
+    >>> decoder = KeyDecoder('utf8')
+    >>> decoder.decode(b'a\\x1b[A\\xc3\\x9f\\x1b')
+    (['a', '<UP>', 'ß', '<ESC>'], 7)
+    """
+
+    def __init__(self, encoding: str, keynames: Keynames = Keynames.CURTSIES) -> None:
+        self.encoding = encoding
+        self.keynames = keynames
+        self._root = _KeyNode()
+        for table in (CURSES_NAMES, CURTSIES_NAMES, (PASTE_START, PASTE_END)):
+            for seq in table:
+                node = self._root
+                for byte in seq:
+                    node = node.children.setdefault(byte, _KeyNode())
+                node.named = seq in CURSES_NAMES or seq in CURTSIES_NAMES
+        ascii_chars = bytes(range(0x80))
+        try:
+            self._ascii = ascii_chars.decode(encoding) == ascii_chars.decode("ascii")
+        except UnicodeDecodeError:
+            self._ascii = False
+        self._utf8 = codecs.lookup(encoding).name == "utf-8"
+        self._ascii_keys = (
+            [_key_name(chr_byte(i), encoding, keynames) for i in range(0x80)]
+            if self._ascii
+            else []
+        )
+        self.char_keys = {
+            chr(i): key for i, key in enumerate(self._ascii_keys) if key != chr(i)
+        }
+        if keynames == Keynames.BYTES or not self._ascii:
+            self._plain: re.Pattern[bytes] | None = None
+        elif self._utf8:
+            self._plain = _UTF8_TEXT
+        else:
+            self._plain = _ASCII_TEXT
+
+    def next_key(
+        self,
+        data: bytes | bytearray | memoryview,
+        start: int = 0,
+        full: bool = True,
+        stop: int | None = None,
+    ) -> tuple[str | None, int]:
+        """Returns the key at start in data and the offset just after it
+
+        Returns None and start if the bytes from start are only the
+        beginning of a key. If full, data is all the input there is, so
+        bytes at its end that are both a key and the prefix of a longer one
+        are returned as the shorter key rather than waiting for more. If
+        stop is given, data is treated as ending there.
+
+        Raises UnicodeDecodeError for bytes which aren't a key and can't
+        become one, or ValueError once MAX_KEYPRESS_SIZE bytes haven't
+        made up a key."""
+        end = len(data) if stop is None else stop
+        if start >= end:
+            return None, start
+        byte = data[start]
+        if byte < 0x80 and byte != 0x1B and self._ascii:
+            return self._ascii_keys[byte], start + 1
+        if self._utf8 and byte >= 0xC2:
+            size = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            if start + size < end or (full and start + size == end):
+                seq = bytes(data[start : start + size])
+                if decodable(seq, "utf8"):
+                    return _key_name(seq, "utf8", self.keynames), start + size
+
+        node: _KeyNode | None = self._root
+        only_ascii = self._ascii
+        for stop in range(start + 1, start + MAX_KEYPRESS_SIZE + 2):
+            if stop > end:
+                return None, start
+            if stop - start > MAX_KEYPRESS_SIZE:
+                raise ValueError("unable to decode bytes %r" % bytes(data[start:stop]))
+            byte = data[stop - 1]
+            node = node.children.get(byte) if node is not None else None
+            seq = bytes(data[start:stop])
+            only_ascii = only_ascii and byte < 0x80
+            known = (
+                node is not None
+                and node.named
+                or only_ascii
+                or decodable(seq, self.encoding)
+            )
+            if known and full and stop == end:
+                return _key_name(seq, self.encoding, self.keynames), stop
+            elif (node is not None and node.children) or (
+                not only_ascii and could_be_unfinished_char(seq, self.encoding)
+            ):
+                continue  # need more input to make up a full keypress
+            elif known:
+                return _key_name(seq, self.encoding, self.keynames), stop
+            else:
+                seq.decode(self.encoding)
+                assert False, "should have raised an unicode decode error"
+        assert False, "loop always returns or raises"
+
+    def text_run(
+        self,
+        data: bytes | bytearray | memoryview,
+        start: int = 0,
+        stop: int | None = None,
+    ) -> tuple[str, int]:
+        """Returns the characters from start in data and the offset after them
+
+        The characters are decoded in one go, and each is the key
+        char_keys.get(char, char). The run ends before escape sequences and
+        bytes which aren't a whole character, for which next_key is needed.
+        Runs are always empty for Keynames.BYTES and encodings other than
+        UTF-8 and ASCII supersets, where only ASCII is decoded."""
+        if self._plain is None:
+            return "", start
+        m = self._plain.match(data, start, len(data) if stop is None else stop)
+        if m is None:
+            return "", start
+        end = m.end()
+        try:
+            return str(data[start:end], self.encoding), end
+        except UnicodeDecodeError as e:
+            end = start + e.start
+            return str(data[start:end], self.encoding), end
+
+    def decode(
+        self, data: bytes | bytearray | memoryview, full: bool = True
+    ) -> tuple[list[str], int]:
+        """Returns the keys in data and the number of bytes they took up
+
+        Bytes after the last key are the beginning of an unfinished one."""
+        keys: list[str] = []
+        offset = 0
+        while True:
+            key, after = self.next_key(data, offset, full)
+            if key is None:
+                return keys, offset
+            keys.append(key)
+            offset = after
+
+
 def pp_event(seq: Event | str) -> str | bytes:
     """Returns pretty representation of an Event or keypress"""
 
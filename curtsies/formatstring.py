@@ -20,20 +20,34 @@ red('hello')
 """
 
 import re
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
 from cwcwidth import wcswidth, wcwidth
 from functools import cached_property
-from itertools import chain
+from itertools import accumulate, chain
 from typing import (
     Any,
     Dict,
+    Generic,
     List,
+    NamedTuple,
     Optional,
     Tuple,
+    TypeVar,
     Union,
     cast,
     no_type_check,
 )
-from collections.abc import Callable, Iterable, Iterator, Mapping, MutableMapping
+from collections.abc import (
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Sequence,
+)
 
 from .escseqparse import parse, remove_ansi
 from .termformatconstants import (
@@ -45,7 +59,9 @@ from .termformatconstants import (
     RESET_ALL,
     RESET_BG,
     RESET_FG,
+    STYLE_RESETS,
     seq,
+    sgr,
 )
 
 one_arg_xforms: Mapping[str, Callable[[str], str]] = {
@@ -64,19 +80,114 @@ two_arg_xforms: Mapping[str, Callable[[str, int], str]] = {
 
 
 class FrozenAttributes(dict[str, Union[int, bool]]):
-    """Immutable dictionary class for format string attributes"""
+    """Immutable dictionary class for format string attributes
+
+    Instances obtained through intern_atts() are shared between all Chunks
+    with the same attributes and carry their attributes packed into an int,
+    so two interned instances are equal only if they are the same object."""
+
+    # packed representation, only set on interned instances
+    packed: int | None = None
+    # fields present in packed, used to merge packed attributes
+    _mask = 0
+    _hash: int | None = None
 
     def __setitem__(self, key: str, value: int | bool) -> None:
         raise Exception("Cannot change value.")
 
+    def __delitem__(self, key: str) -> None:
+        raise Exception("Cannot change value.")
+
     def update(self, *args: Any, **kwds: Any) -> None:
         raise Exception("Cannot change value.")
 
+    @no_type_check
+    def _immutable(self, *args, **kwargs):
+        raise Exception("Cannot change value.")
+
+    clear = pop = popitem = setdefault = __ior__ = _immutable
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        if self._hash is None:
+            self._hash = hash(frozenset(self.items()))
+        return self._hash
+
     def extend(self, dictlike: Mapping[str, int | bool]) -> "FrozenAttributes":
-        return FrozenAttributes(chain(self.items(), dictlike.items()))
+        other = intern_atts(dictlike)
+        if self.packed is not None and other.packed is not None:
+            return _atts_from_packed((self.packed & ~other._mask) | other.packed)
+        return intern_atts(dict(chain(self.items(), other.items())))
 
     def remove(self, *keys: str) -> "FrozenAttributes":
-        return FrozenAttributes((k, v) for k, v in self.items() if k not in keys)
+        if self.packed is not None:
+            mask = 0
+            for key in keys:
+                mask |= _FIELD_MASKS.get(key, 0)
+            return _atts_from_packed(self.packed & ~mask)
+        return intern_atts({k: v for k, v in self.items() if k not in keys})
+
+
+# Packed attributes: fg in bits 0-7, bg in bits 8-15 and two bits per style
+# after that (0 for absent, 1 for False and 2 for True).
+_STYLE_SHIFTS: Mapping[str, int] = {style: 16 + 2 * i for i, style in enumerate(STYLES)}
+_FIELD_MASKS: Mapping[str, int] = dict(
+    {"fg": 0xFF, "bg": 0xFF << 8},
+    **{style: 0b11 << shift for style, shift in _STYLE_SHIFTS.items()},
+)
+_INTERNED_ATTS: dict[int, FrozenAttributes] = {}
+
+
+def _pack_atts(atts: Mapping[str, int | bool]) -> int | None:
+    """Returns atts packed into an int, or None if they can't be packed"""
+    packed = 0
+    for k, v in atts.items():
+        if k == "fg" or k == "bg":
+            if type(v) is not int or not 0 < v < 256:
+                return None
+            packed |= v if k == "fg" else v << 8
+        elif k in _STYLE_SHIFTS and type(v) is bool:
+            packed |= (2 if v else 1) << _STYLE_SHIFTS[k]
+        else:
+            return None
+    return packed
+
+
+def _atts_from_packed(packed: int) -> FrozenAttributes:
+    try:
+        return _INTERNED_ATTS[packed]
+    except KeyError:
+        pass
+    items: list[tuple[str, int | bool]] = []
+    mask = 0
+    for k, field_mask in _FIELD_MASKS.items():
+        if packed & field_mask:
+            mask |= field_mask
+            if k == "fg":
+                items.append((k, packed & 0xFF))
+            elif k == "bg":
+                items.append((k, (packed >> 8) & 0xFF))
+            else:
+                items.append((k, (packed >> _STYLE_SHIFTS[k]) & 0b11 == 2))
+    atts = FrozenAttributes(items)
+    atts.packed = packed
+    atts._mask = mask
+    _INTERNED_ATTS[packed] = atts
+    return atts
+
+
+def intern_atts(atts: Mapping[str, int | bool] | None) -> FrozenAttributes:
+    """Returns the shared FrozenAttributes instance equal to atts.
+
+    Attributes that can't be packed (unknown keys or values) get a new,
+    unshared instance instead."""
+    if isinstance(atts, FrozenAttributes) and atts.packed is not None:
+        return atts
+    if not atts:
+        return _atts_from_packed(0)
+    packed = _pack_atts(atts)
+    if packed is None:
+        return FrozenAttributes(atts)
+    return _atts_from_packed(packed)
 
 
 def stable_format_dict(d: Mapping) -> str:
@@ -97,6 +208,30 @@ def stable_format_dict(d: Mapping) -> str:
     return "{%s}" % inner
 
 
+def str_width(s: str) -> int:
+    """Returns the display width of s, or -1 if it contains unprintable characters
+
+    Printable ASCII is one column per character and skips wcswidth.
+
+    >>> str_width('abc'), str_width('\uff25'), str_width('a\x07')
+    (3, 2, -1)
+    """
+    if s.isascii() and s.isprintable():
+        return len(s)
+    return wcswidth(s)
+
+
+def char_widths(s: str) -> list[int]:
+    """Returns the display width of each character of s
+
+    >>> char_widths('a\uff25\u0300')
+    [1, 2, 0]
+    """
+    if s.isascii() and s.isprintable():
+        return [1] * len(s)
+    return list(map(wcwidth, s))
+
+
 class Chunk:
     """A string with a single set of formatting attributes
 
@@ -106,7 +241,7 @@ class Chunk:
         if not isinstance(string, str):
             raise ValueError("unicode string required, got %r" % string)
         self._s = string
-        self._atts = FrozenAttributes(atts if atts else {})
+        self._atts = intern_atts(atts)
 
     @property
     def s(self) -> str:
@@ -120,9 +255,14 @@ class Chunk:
     def __len__(self) -> int:
         return len(self._s)
 
+    @cached_property
+    def raw_width(self) -> int:
+        "Display width as reported by wcswidth, -1 if there are unprintable characters"
+        return str_width(self._s)
+
     @property
     def width(self) -> int:
-        width = wcswidth(self._s)
+        width = self.raw_width
         if len(self._s) > 0 and width < 1:
             raise ValueError("Can't calculate width of string %r" % self._s)
         return width
@@ -153,7 +293,11 @@ class Chunk:
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, Chunk):
             return NotImplemented
-        return self._s == other._s and self._atts == other._atts
+        atts, other_atts = self._atts, other._atts
+        # interned attributes are equal only if identical
+        return self._s == other._s and (
+            atts is other_atts or (atts.packed is None and atts == other_atts)
+        )
 
     def __hash__(self) -> int:
         return hash((self._s, self._atts))
@@ -204,10 +348,7 @@ class ChunkSplitter:
         self.chunk = chunk
         self.internal_offset = 0  # index into chunk.s
         self.internal_width = 0  # width of chunks.s[:self.internal_offset]
-        divides = [0]
-        for c in self.chunk.s:
-            divides.append(divides[-1] + wcwidth(c))
-        self.divides = divides
+        self.divides = [0, *accumulate(char_widths(chunk.s))]
 
     def request(self, max_width: int) -> tuple[int, Chunk] | None:
         """Requests a sub-chunk of max_width or shorter. Returns None if no chunks left."""
@@ -217,53 +358,104 @@ class ChunkSplitter:
         s = self.chunk.s
         length = len(s)
 
-        if self.internal_offset == len(s):
+        if self.internal_offset == length:
             return None
 
-        width = 0
-        start_offset = i = self.internal_offset
-        replacement_char = " "
-
-        while True:
-            w = wcswidth(s[i], None)
-
-            # If adding a character puts us over the requested width, return what we've got so far
-            if width + w > max_width:
-                self.internal_offset = i  # does not include ith character
-                self.internal_width += width
-
-                # if not adding it us makes us short, this must have been a double-width character
-                if width < max_width:
-                    assert (
-                        width + 1 == max_width
-                    ), "unicode character width of more than 2!?!"
-                    assert w == 2, "unicode character of width other than 2?"
-                    return (
-                        width + 1,
-                        Chunk(
-                            s[start_offset : self.internal_offset] + replacement_char,
-                            atts=self.chunk.atts,
-                        ),
-                    )
-                return (
-                    width,
-                    Chunk(s[start_offset : self.internal_offset], atts=self.chunk.atts),
-                )
-            # otherwise add this width
-            width += w
-
-            # If one more char would put us over, return whatever we've got
-            if i + 1 == length:
-                self.internal_offset = (
-                    i + 1
-                )  # beware the fencepost, i is an index not an offset
-                self.internal_width += width
-                return (
-                    width,
-                    Chunk(s[start_offset : self.internal_offset], atts=self.chunk.atts),
-                )
-            # otherwise attempt to add the next character
-            i += 1
+        start_offset = self.internal_offset
+        divides = self.divides
+        # take every character that still fits, including trailing zero-width ones
+        end_offset = (
+            bisect_right(divides, self.internal_width + max_width, start_offset) - 1
+        )
+        width = divides[end_offset] - self.internal_width
+        self.internal_offset = end_offset
+        self.internal_width += width
+
+        # if the next character doesn't fit but we are short, it must be double-width
+        if end_offset < length and width < max_width:
+            assert width + 1 == max_width, "unicode character width of more than 2!?!"
+            assert (
+                divides[end_offset + 1] - divides[end_offset] == 2
+            ), "unicode character of width other than 2?"
+            return (
+                width + 1,
+                Chunk(s[start_offset:end_offset] + " ", atts=self.chunk.atts),
+            )
+        return (width, Chunk(s[start_offset:end_offset], atts=self.chunk.atts))
+
+
+class SGRSerializer:
+    """Renders chunks as text with the fewest SGR escape sequences
+
+    Tracks the formatting the terminal is in and emits only the changes
+    needed for each chunk, combined into a single sequence.
+
+    >>> serializer = SGRSerializer()
+    >>> out = serializer.serialize(fmtstr('ab', 'red', 'bold') + fmtstr('cd', 'red'))
+    >>> out == '\x1b[31;1mab\x1b[22mcd\x1b[0m'
+    True
+    """
+
+    def __init__(self) -> None:
+        self.state: Mapping[str, int | bool] = {}
+
+    @staticmethod
+    def _effective(atts: Mapping[str, int | bool]) -> dict[str, int | bool]:
+        """Attributes which change how text is displayed"""
+        return {
+            k: v
+            for k, v in atts.items()
+            if v is not False and (k in one_arg_xforms or k in two_arg_xforms)
+        }
+
+    @staticmethod
+    def _codes(atts: Mapping[str, int | bool]) -> list[int]:
+        codes = [cast(int, atts[k]) for k in ("fg", "bg") if k in atts]
+        codes.extend(code for style, code in STYLES.items() if style in atts)
+        return codes
+
+    def transition(self, atts: Mapping[str, int | bool]) -> str:
+        """Returns the escape sequence changing the current formatting to atts"""
+        new = self._effective(atts)
+        old = self.state
+        if new == old:
+            return ""
+        self.state = new
+        if not new:
+            return sgr(RESET_ALL)
+
+        offs = [
+            code
+            for code, key in ((RESET_FG, "fg"), (RESET_BG, "bg"))
+            if key in old and key not in new
+        ]
+        offs.extend(
+            sorted({STYLE_RESETS[k] for k in old if k in STYLES and k not in new})
+        )
+        # styles left on after turning others off
+        kept = {
+            k: v
+            for k, v in old.items()
+            if k not in STYLES or STYLE_RESETS[k] not in offs
+        }
+        changes = {k: v for k, v in new.items() if kept.get(k) != v}
+        incremental = offs + self._codes(changes)
+        from_reset = [RESET_ALL] + self._codes(new)
+        if len(sgr(*from_reset)) < len(sgr(*incremental)):
+            return sgr(*from_reset)
+        return sgr(*incremental)
+
+    def chunk(self, chunk: Chunk) -> str:
+        """Returns chunk with the escape sequences needed before it"""
+        return self.transition(chunk.atts) + chunk.s
+
+    def reset(self) -> str:
+        """Returns the escape sequence to leave the terminal unformatted"""
+        return self.transition({})
+
+    def serialize(self, fs: "FmtStr") -> str:
+        """Returns fs with escape sequences, leaving the terminal unformatted"""
+        return "".join([self.chunk(c) for c in fs.chunks if c.s]) + self.reset()
 
 
 class FmtStr:
@@ -280,6 +472,9 @@ class FmtStr:
         self._len: int | None = None
         self._s: str | None = None
         self._width: int | None = None
+        self._divides: list[int] | None = None
+        self._width_divides: list[int] | None = None
+        self._sgr_str: str | None = None
 
     @staticmethod
     def from_str(s: str) -> "FmtStr":
@@ -377,7 +572,7 @@ class FmtStr:
                 new_components.extend([head] + new_fs.chunks)
                 inserted = True
 
-                if bfs_start < end < bfs_end:
+                if bfs_start <= end < bfs_end:
                     tail = Chunk(bfs.s[end - bfs_start :], atts=bfs.atts)
                     new_components.append(tail)
 
@@ -400,10 +595,8 @@ class FmtStr:
 
     def copy_with_new_atts(self, **attributes: bool | int) -> "FmtStr":
         """Returns a new FmtStr with the same content but new formatting"""
-
-        return FmtStr(
-            *(Chunk(bfs.s, bfs.atts.extend(attributes)) for bfs in self.chunks)
-        )
+        atts = intern_atts(attributes)
+        return FmtStr(*(Chunk(bfs.s, bfs.atts.extend(atts)) for bfs in self.chunks))
 
     def join(self, iterable: Iterable[Union[str, "FmtStr"]]) -> "FmtStr":
         """Joins an iterable yielding strings or FmtStrs with self as separator"""
@@ -495,6 +688,21 @@ class FmtStr:
         self._unicode = "".join(str(fs) for fs in self.chunks)
         return self._unicode
 
+    def sgr_str(self) -> str:
+        """Returns the string with the fewest escape sequences needed to
+        display it, ending with the terminal unformatted.
+
+        Unlike str(), formatting shared by adjacent chunks is not reset
+        and set again.
+
+        >>> fs = fmtstr('a', 'red', 'on_blue') + fmtstr('b', 'red')
+        >>> fs.sgr_str() == '\x1b[31;44ma\x1b[49mb\x1b[0m'
+        True
+        """
+        if self._sgr_str is None:
+            self._sgr_str = SGRSerializer().serialize(self)
+        return self._sgr_str
+
     def __len__(self) -> int:
         if self._len is not None:
             return self._len
@@ -513,16 +721,32 @@ class FmtStr:
 
     def width_at_offset(self, n: int) -> int:
         """Returns the horizontal position of character n of the string"""
-        # TODO make more efficient?
-        width = wcswidth(self.s, n)
-        assert width != -1
-        return width
+        width_divides = self.width_divides
+        if width_divides is None or n < 0:
+            width = wcswidth(self.s, n)
+            assert width != -1
+            return width
+        divides = self.divides
+        if n >= divides[-1]:
+            return width_divides[-1]
+        i = bisect_right(divides, n) - 1
+        return width_divides[i] + str_width(self.chunks[i].s[: n - divides[i]])
 
     def __repr__(self) -> str:
         return "+".join(fs.repr_part() for fs in self.chunks)
 
     def __eq__(self, other: Any) -> bool:
-        if isinstance(other, (str, bytes, FmtStr)):
+        if isinstance(other, FmtStr):
+            # avoid rendering escape sequences when the answer is clear
+            if self is other:
+                return True
+            s, other_s = self.s, other.s
+            if s != other_s and "\x1b" not in s and "\x1b" not in other_s:
+                return False
+            if self.chunks == other.chunks:
+                return True
+            return str(self) == str(other)
+        if isinstance(other, (str, bytes)):
             return str(self) == str(other)
         return NotImplemented
 
@@ -596,11 +820,30 @@ class FmtStr:
     @property
     def divides(self) -> list[int]:
         """List of indices of divisions between the constituent chunks."""
+        if self._divides is not None:
+            return self._divides
         acc = [0]
         for s in self.chunks:
             acc.append(acc[-1] + len(s))
+        self._divides = acc
         return acc
 
+    @property
+    def width_divides(self) -> list[int] | None:
+        """List of columns of divisions between the constituent chunks,
+        or None if the string contains characters without a display width."""
+        if self._width_divides is not None:
+            return self._width_divides if self._width_divides[-1] != -1 else None
+        acc = [0]
+        for chunk in self.chunks:
+            width = chunk.raw_width
+            if width == -1:
+                acc.append(-1)
+                break
+            acc.append(acc[-1] + width)
+        self._width_divides = acc
+        return acc if acc[-1] != -1 else None
+
     @property
     def s(self) -> str:
         if self._s is not None:
@@ -610,45 +853,46 @@ class FmtStr:
 
     def __getitem__(self, index: int | slice) -> "FmtStr":
         index = normalize_slice(len(self), index)
-        counter = 0
+        divides = self.divides
         parts = []
-        for chunk in self.chunks:
+        for i in range(
+            max(0, bisect_right(divides, index.start) - 1), len(self.chunks)
+        ):
+            chunk = self.chunks[i]
+            counter = divides[i]
             if index.start < counter + len(chunk) and index.stop > counter:
                 start = max(0, index.start - counter)
                 end = min(index.stop - counter, len(chunk))
                 if end - start == len(chunk):
                     parts.append(chunk)
                 else:
-                    s_part = chunk.s[
-                        max(0, index.start - counter) : index.stop - counter
-                    ]
+                    s_part = chunk.s[start : index.stop - counter]
                     parts.append(Chunk(s_part, chunk.atts))
-            counter += len(chunk)
-            if index.stop < counter:
+            if index.stop < divides[i + 1]:
                 break
         return FmtStr(*parts) if parts else fmtstr("")
 
     def width_aware_slice(self, index: int | slice) -> "FmtStr":
         """Slice based on the number of columns it would take to display the substring."""
-        if wcswidth(self.s, None) == -1:
+        width_divides = self.width_divides
+        if width_divides is None:
             raise ValueError("bad values for width aware slicing")
-        index = normalize_slice(self.width, index)
-        counter = 0
+        index = normalize_slice(width_divides[-1], index)
         parts = []
-        for chunk in self.chunks:
-            if index.start < counter + chunk.width and index.stop > counter:
-                start = max(0, index.start - counter)
-                end = min(index.stop - counter, chunk.width)
-                if end - start == chunk.width:
-                    parts.append(chunk)
-                else:
-                    s_part = width_aware_slice(
-                        chunk.s, max(0, index.start - counter), index.stop - counter
-                    )
-                    parts.append(Chunk(s_part, chunk.atts))
-            counter += chunk.width
-            if index.stop < counter:
+        first = max(0, bisect_right(width_divides, index.start) - 1)
+        for i in range(first, len(self.chunks)):
+            counter = width_divides[i]
+            if index.stop <= counter:
                 break
+            chunk = self.chunks[i]
+            chunk_width = width_divides[i + 1] - counter
+            start = max(0, index.start - counter)
+            end = min(index.stop - counter, chunk_width)
+            if end - start == chunk_width:
+                parts.append(chunk)
+            else:
+                s_part = width_aware_slice(chunk.s, start, index.stop - counter)
+                parts.append(Chunk(s_part, chunk.atts))
         return FmtStr(*parts) if parts else fmtstr("")
 
     def width_aware_splitlines(self, columns: int) -> Iterator["FmtStr"]:
@@ -658,7 +902,7 @@ class FmtStr:
         """
         if columns < 2:
             raise ValueError("Column width %s is too narrow." % columns)
-        if wcswidth(self.s, None) == -1:
+        if self.width_divides is None:
             raise ValueError("bad values for width aware slicing")
         return self._width_aware_splitlines(columns)
 
@@ -727,9 +971,7 @@ def width_aware_slice(s: str, start: int, end: int, replacement_char: str = " ")
     >>> width_aware_slice(u'a\uff25iou', 0, 2)[1] == u' '
     True
     """
-    divides = [0]
-    for c in s:
-        divides.append(divides[-1] + wcwidth(c))
+    divides = [0, *accumulate(char_widths(s))]
 
     new_chunk_chars = []
     for char, char_start, char_end in zip(s, divides[:-1], divides[1:]):
@@ -756,39 +998,200 @@ def linesplit(string: str | FmtStr, columns: int) -> list[FmtStr]:
 
     >>> linesplit(fmtstr(" home    is where the heart-eating mummy is", 'blue'), 10)
     [blue('home')+blue(' ')+blue('is'), blue('where')+blue(' ')+blue('the'), blue('heart-eati'), blue('ng')+blue(' ')+blue('mummy'), blue('is')]
+
+    Lines are measured in characters, use word_wrap to measure them in
+    display columns.
     """
     if not isinstance(string, FmtStr):
         string = fmtstr(string)
+    if columns < 1:
+        raise ValueError("Column width %s is too narrow." % columns)
+    return list(_fill(_words(string.chunks, len), columns, width_aware=False))
+
+
+def word_wrap(string: str | FmtStr, columns: int) -> Iterator[FmtStr]:
+    """Yields the lines of string wrapped to columns, like linesplit
+
+    Lines are measured in display columns and produced as they are found,
+    so the start of a long paragraph can be displayed before the rest has
+    been wrapped. Words wider than a line are split like
+    FmtStr.width_aware_splitlines splits lines.
+
+    >>> list(word_wrap(fmtstr("ｈｉ there", 'red') + fmtstr(" you", 'blue'), 6))
+    [red('ｈｉ'), red('there'), blue('you')]
+    """
+    if not isinstance(string, FmtStr):
+        string = fmtstr(string)
+    _check_wrappable(string, columns)
+    return _fill(_words(string.chunks, _checked_width), columns)
+
+
+# (attributes of the whitespace before the word, chunks of the word, width)
+_Word = tuple[Optional[FrozenAttributes], list[Chunk], int]
+_WORD_OR_SPACE = re.compile(r"(\s+)|\S+")
+
+
+def _check_wrappable(string: FmtStr, columns: int) -> None:
+    if columns < 1 or (columns < 2 and 2 in char_widths(string.s)):
+        raise ValueError("Column width %s is too narrow." % columns)
+
+
+def _checked_width(text: str) -> int:
+    width = str_width(text)
+    if width == -1:
+        raise ValueError("Can't calculate width of string %r" % text)
+    return width
+
+
+def _words(chunks: Iterable[Chunk], measure: Callable[[str], int]) -> Iterator[_Word]:
+    """Yields the words of a string in one pass over its chunks
+
+    Words may span several chunks, whitespace between words is dropped.
+    Their widths are the sum of measure() of their pieces."""
+    space: FrozenAttributes | None = None  # shared atts of the current whitespace
+    before: FrozenAttributes | None = None  # atts of the whitespace before pieces
+    pieces: list[Chunk] = []
+    width = 0
+    first = True
+    for chunk in chunks:
+        for m in _WORD_OR_SPACE.finditer(chunk.s):
+            if m.lastindex:
+                if pieces:
+                    yield before, pieces, width
+                    pieces, width = [], 0
+                if space is None:
+                    space = chunk.atts
+                elif space is not chunk.atts:
+                    # whitespace across chunks gets the attributes they share
+                    atts = chunk.atts
+                    space = intern_atts(
+                        {k: v for k, v in space.items() if atts.get(k, "???") == v}
+                    )
+                continue
+            if not pieces:
+                before, space = (None if first else space), None
+                first = False
+            text = m.group()
+            pieces.append(chunk if len(text) == len(chunk) else Chunk(text, chunk.atts))
+            width += measure(text)
+    if pieces:
+        yield before, pieces, width
+
+
+def _fill(
+    words: Iterable[_Word], columns: int, width_aware: bool = True
+) -> Iterator[FmtStr]:
+    """Yields lines of at most columns made from words joined by spaces
+
+    Words wider than a line are split by display width if width_aware,
+    else by number of characters."""
+    line: list[Chunk] = []
+    width_of_line = 0
+    splitter: ChunkSplitter | None = None
+    for before, pieces, width in words:
+        if line and width_of_line + 1 + width <= columns:
+            line.append(Chunk(" ", before))
+            line.extend(pieces)
+            width_of_line += 1 + width
+            continue
+        if line:
+            yield FmtStr(*line)
+        if width <= columns:
+            line, width_of_line = list(pieces), width
+            continue
+        # too wide for any line, so break the word wherever it reaches the edge
+        line, width_of_line = [], 0
+        for piece in pieces:
+            if not width_aware:
+                start = 0
+                while start < len(piece):
+                    end = start + columns - width_of_line
+                    line.append(Chunk(piece.s[start:end], piece.atts))
+                    width_of_line += len(line[-1])
+                    start = end
+                    if width_of_line == columns:
+                        yield FmtStr(*line)
+                        line, width_of_line = [], 0
+                continue
+            if splitter is None:
+                splitter = piece.splitter()
+            else:
+                splitter.reinit(piece)
+            while True:
+                request = splitter.request(columns - width_of_line)
+                if request is None:
+                    break
+                w, new_chunk = request
+                line.append(new_chunk)
+                width_of_line += w
+                if width_of_line == columns:
+                    yield FmtStr(*line)
+                    line, width_of_line = [], 0
+    if line:
+        yield FmtStr(*line)
+
+
+class WordWrapper:
+    """Word wraps a list of paragraphs, each wrapped like word_wrap.
+
+    The words of each paragraph are found once and kept, so wrapping
+    again at a new width (e.g. after the terminal is resized) only
+    redoes the line filling. Replacing a paragraph forgets the words of
+    that paragraph only.
+
+    >>> wrapper = WordWrapper(['one two three', '', fmtstr('four', 'blue')])
+    >>> list(wrapper.wrap(8))
+    ['one'+' '+'two', 'three', '', blue('four')]
+    >>> wrapper[0] = 'one'
+    >>> list(wrapper.wrap(3))
+    ['one', '', blue('fou'), blue('r')]
+    """
+
+    def __init__(self, paragraphs: Iterable[str | FmtStr] = ()) -> None:
+        self._paragraphs: list[FmtStr] = []
+        self._words: list[list[_Word] | None] = []
+        for paragraph in paragraphs:
+            self.append(paragraph)
+
+    def __len__(self) -> int:
+        return len(self._paragraphs)
+
+    def __getitem__(self, index: int) -> FmtStr:
+        return self._paragraphs[index]
 
-    string_s = string.s
-    matches = list(re.finditer(r"\s+", string_s))
-    spaces = [
-        string[m.start() : m.end()]
-        for m in matches
-        if m.start() != 0 and m.end() != len(string_s)
-    ]
-    words = [
-        string[start:end]
-        for start, end in zip(
-            [0] + [m.end() for m in matches],
-            [m.start() for m in matches] + [len(string_s)],
+    def __setitem__(self, index: int, paragraph: str | FmtStr) -> None:
+        self._paragraphs[index] = (
+            paragraph if isinstance(paragraph, FmtStr) else fmtstr(paragraph)
         )
-        if start != end
-    ]
-
-    word_to_lines = lambda word: [
-        word[columns * i : columns * (i + 1)]
-        for i in range((len(word) - 1) // columns + 1)
-    ]
-
-    lines = word_to_lines(words[0])
-    for word, space in zip(words[1:], spaces):
-        if len(lines[-1]) + len(word) < columns:
-            lines[-1] += fmtstr(" ", **space.shared_atts)
-            lines[-1] += word
-        else:
-            lines.extend(word_to_lines(word))
-    return lines
+        self._words[index] = None
+
+    def append(self, paragraph: str | FmtStr) -> None:
+        self._paragraphs.append(
+            paragraph if isinstance(paragraph, FmtStr) else fmtstr(paragraph)
+        )
+        self._words.append(None)
+
+    def words(self, index: int) -> list[_Word]:
+        """Returns the words of a paragraph, scanning it the first time"""
+        words = self._words[index]
+        if words is None:
+            words = list(_words(self._paragraphs[index].chunks, _checked_width))
+            self._words[index] = words
+        return words
+
+    def wrap_paragraph(self, index: int, columns: int) -> Iterator[FmtStr]:
+        """Yields the lines of one paragraph, a blank paragraph is one empty line"""
+        _check_wrappable(self._paragraphs[index], columns)
+        words = self.words(index)
+        if not words:
+            yield fmtstr("")
+            return
+        yield from _fill(words, columns)
+
+    def wrap(self, columns: int) -> Iterator[FmtStr]:
+        """Yields the lines of all paragraphs"""
+        for index in range(len(self._paragraphs)):
+            yield from self.wrap_paragraph(index, columns)
 
 
 def normalize_slice(length: int, index: int | slice) -> slice:
@@ -813,6 +1216,17 @@ def normalize_slice(length: int, index: int | slice) -> slice:
     return index
 
 
+# style arguments and the attribute each one sets
+_STYLE_ARGS: Mapping[str, tuple[str, int | bool]] = {
+    **{color: ("fg", value) for color, value in FG_COLORS.items()},
+    **{"on_" + color: ("bg", value) for color, value in BG_COLORS.items()},
+    **{style: (style, True) for style in STYLES},
+}
+_ATTRIBUTE_NAMES = frozenset(("fg", "bg", *STYLES))
+_FG_VALUES = frozenset(FG_COLORS.values())
+_BG_VALUES = frozenset(BG_COLORS.values())
+
+
 def parse_args(
     args: tuple[str, ...],
     kwargs: MutableMapping[str, int | bool | str],
@@ -824,48 +1238,268 @@ def parse_args(
     for arg in args:
         if not isinstance(arg, str):
             raise ValueError(f"args must be strings: {arg!r}")
-        if arg.lower() in FG_COLORS:
-            if "fg" in kwargs:
-                raise ValueError("fg specified twice")
-            kwargs["fg"] = FG_COLORS[cast(str, arg)]
-        elif arg.lower().startswith("on_") and arg[3:].lower() in BG_COLORS:
-            if "bg" in kwargs:
-                raise ValueError("fg specified twice")
-            kwargs["bg"] = BG_COLORS[cast(str, arg[3:])]
-        elif arg.lower() in STYLES:
-            kwargs[arg] = True
-        else:
-            raise ValueError(f"couldn't process arg: {args!r}")
+        try:
+            key, value = _STYLE_ARGS[arg.lower()]
+        except KeyError:
+            raise ValueError(f"couldn't process arg: {args!r}") from None
+        if key in kwargs and key in ("fg", "bg"):
+            raise ValueError(f"{key} specified twice")
+        kwargs[key] = value
     for k in kwargs:
-        if k not in ("fg", "bg") and k not in STYLES.keys():
+        if k not in _ATTRIBUTE_NAMES:
             raise ValueError("Can't apply that transformation")
     if "fg" in kwargs:
-        if kwargs["fg"] in FG_COLORS:
-            kwargs["fg"] = FG_COLORS[cast(str, kwargs["fg"])]
-        if kwargs["fg"] not in list(FG_COLORS.values()):
+        fg = kwargs["fg"]
+        if isinstance(fg, str):
+            fg = kwargs["fg"] = FG_COLORS.get(fg, fg)
+        if not isinstance(fg, int) or fg not in _FG_VALUES:
             raise ValueError(f"Bad fg value: {kwargs['fg']!r}")
     if "bg" in kwargs:
-        if kwargs["bg"] in BG_COLORS:
-            kwargs["bg"] = BG_COLORS[cast(str, kwargs["bg"])]
-        if kwargs["bg"] not in list(BG_COLORS.values()):
+        bg = kwargs["bg"]
+        if isinstance(bg, str):
+            bg = kwargs["bg"] = BG_COLORS.get(bg, bg)
+        if not isinstance(bg, int) or bg not in _BG_VALUES:
             raise ValueError(f"Bad bg value: {kwargs['bg']!r}")
     return cast(MutableMapping[str, Union[int, bool]], kwargs)
 
 
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    maxweight: int | None
+    currweight: int
+
+
+class LRUCache(Generic[K, V]):
+    """A mapping which forgets the least recently used entries
+
+    Holds at most maxsize entries, and if maxweight is not None, entries
+    whose weights add up to at most maxweight. A maxsize of 0 disables it.
+    It is safe to use from several threads.
+
+    >>> cache: LRUCache[str, int] = LRUCache(maxsize=2)
+    >>> cache.put('a', 1); cache.put('b', 2); cache.get('a')
+    1
+    >>> cache.put('c', 3); cache.get('b') is None
+    True
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, maxsize=2, currsize=2, maxweight=None, currweight=2)
+    """
+
+    def __init__(self, maxsize: int = 128, maxweight: int | None = None) -> None:
+        self._data: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self.hits = 0
+        self.misses = 0
+        self._weight = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        """Returns the value cached for key, or None"""
+        with self._lock:
+            try:
+                value, _ = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V, weight: int = 1) -> None:
+        """Caches value for key, unless it alone would be too heavy"""
+        if self.maxsize <= 0 or (
+            self.maxweight is not None and weight > self.maxweight
+        ):
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._weight -= old[1]
+            self._data[key] = (value, weight)
+            self._weight += weight
+            self._evict()
+
+    def _evict(self) -> None:
+        data = self._data
+        while len(data) > self.maxsize or (
+            self.maxweight is not None and self._weight > self.maxweight
+        ):
+            _, (_, weight) = data.popitem(last=False)
+            self._weight -= weight
+
+    def configure(
+        self, maxsize: int | None = None, maxweight: int | None = None
+    ) -> None:
+        """Changes the bounds of the cache, evicting entries to fit them"""
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if maxweight is not None:
+                self.maxweight = maxweight
+            self._evict()
+
+    def clear(self) -> None:
+        """Empties the cache and resets its statistics"""
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
+            self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(
+            self.hits,
+            self.misses,
+            self.maxsize,
+            len(self._data),
+            self.maxweight,
+            self._weight,
+        )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+
+# attributes for each single style argument, like fmtstr(s, "red") or the
+# fmtfuncs helpers' fmtstr(s, style="red")
+_STYLE_ATTS: Mapping[str, FrozenAttributes] = {
+    name: intern_atts(parse_args((name,), {})) for name in _STYLE_ARGS
+}
+# chunks of FmtStrs created by fmtstr() from strings, keyed on the string and
+# its attributes and weighted by length. Use fmtstr_cache.configure() to tune
+# it or fmtstr_cache.configure(maxsize=0) to disable it.
+fmtstr_cache: LRUCache[tuple[str, FrozenAttributes], tuple[Chunk, ...]] = LRUCache(
+    maxsize=4096, maxweight=1 << 20
+)
+# attributes parsed from other fmtstr() arguments
+parse_args_cache: LRUCache[Hashable, FrozenAttributes] = LRUCache(maxsize=256)
+
+
+class WrapCache:
+    """Remembers how lines were split into rows by width_aware_splitlines
+
+    Rows are cached per line and number of columns, so after a line is
+    edited or appended only that line is wrapped again. Lines are keyed on
+    their chunks rather than on their rendered escape sequences. Rows of
+    lines that are no longer displayed are evicted like any other least
+    recently used entry. An empty line takes one empty row.
+
+    >>> cache = WrapCache()
+    >>> cache.wrap(fmtstr('hello', 'red'), 3)
+    (red('hel'), red('lo'))
+    >>> cache.wrap_lines(['ab', 'cdefg', ''], 2, rows=3)
+    ['ef', 'g', '']
+    """
+
+    def __init__(self, maxsize: int = 16384, maxweight: int | None = 1 << 22) -> None:
+        # weighted by line length
+        self.cache: LRUCache[
+            tuple[str | tuple[Chunk, ...], int], tuple[FmtStr, ...]
+        ] = LRUCache(maxsize, maxweight)
+
+    def wrap(self, line: str | FmtStr, columns: int) -> tuple[FmtStr, ...]:
+        """Returns the rows line takes up in a terminal columns wide"""
+        key = (line if isinstance(line, str) else tuple(line.chunks), columns)
+        rows = self.cache.get(key)
+        if rows is None:
+            if not isinstance(line, FmtStr):
+                line = fmtstr(line)
+            rows = tuple(line.width_aware_splitlines(columns)) or (fmtstr(""),)
+            self.cache.put(key, rows, weight=len(line) + 1)
+        return rows
+
+    def wrap_lines(
+        self, lines: Sequence[str | FmtStr], columns: int, rows: int | None = None
+    ) -> list[FmtStr]:
+        """Returns the rows of all lines, or only the last rows of them.
+
+        When rows is given only the lines needed to fill that many rows are
+        wrapped, starting from the last line."""
+        if rows is None:
+            return [row for line in lines for row in self.wrap(line, columns)]
+        if rows <= 0:
+            return []
+        wrapped: list[tuple[FmtStr, ...]] = []
+        count = 0
+        for line in reversed(lines):
+            if count >= rows:
+                break
+            line_rows = self.wrap(line, columns)
+            wrapped.append(line_rows)
+            count += len(line_rows)
+        result = [row for line_rows in reversed(wrapped) for row in line_rows]
+        return result[len(result) - rows :] if count > rows else result
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+def parse_atts(args: tuple[str, ...], kwargs: dict[str, Any]) -> FrozenAttributes:
+    """Like parse_args, but returns interned attributes.
+
+    A single style argument is looked up in a precomputed table. Style
+    values are normalized to bools, so bold=1 is the same as bold=True.
+    Results for other hashable arguments are cached."""
+    if len(args) + len(kwargs) == 1:
+        style = args[0] if args else kwargs.get("style")
+        if isinstance(style, str):
+            try:
+                return _STYLE_ATTS[style]
+            except KeyError:
+                pass
+    kwargs = {
+        k: bool(v) if k not in ("fg", "bg") and isinstance(v, int) else v
+        for k, v in kwargs.items()
+    }
+    key = (args, tuple(sorted(kwargs.items())))
+    try:
+        atts = parse_args_cache.get(key)
+    except TypeError:  # unhashable arguments
+        return intern_atts(parse_args(args, kwargs))
+    if atts is None:
+        atts = intern_atts(parse_args(args, kwargs))
+        parse_args_cache.put(key, atts)
+    return atts
+
+
 def fmtstr(string: str | FmtStr, *args: Any, **kwargs: Any) -> FmtStr:
     """
     Convenience function for creating a FmtStr
 
+    Parsing strings is cached, see fmtstr_cache. Every call still returns
+    a new FmtStr.
+
     >>> fmtstr('asdf', 'blue', 'on_red', 'bold')
     on_red(bold(blue('asdf')))
     >>> fmtstr('blarg', fg='blue', bg='red', bold=True)
     on_red(bold(blue('blarg')))
     """
-    atts = parse_args(args, kwargs)
-    if isinstance(string, str):
-        string = FmtStr.from_str(string)
-    elif not isinstance(string, FmtStr):
+    if not isinstance(string, (str, FmtStr)):
         raise ValueError(
             f"Bad Args: {string!r} (of type {type(string)}), {args!r}, {kwargs!r}"
         )
+    return fmtstr_with_atts(string, parse_atts(args, kwargs))
+
+
+def fmtstr_with_atts(string: str | FmtStr, atts: FrozenAttributes) -> FmtStr:
+    """fmtstr with attributes already returned by parse_atts"""
+    if isinstance(string, str):
+        key = (string, atts)
+        chunks = fmtstr_cache.get(key)
+        if chunks is None:
+            chunks = tuple(FmtStr.from_str(string).copy_with_new_atts(**atts).chunks)
+            fmtstr_cache.put(key, chunks, len(string))
+        return FmtStr(*chunks)
+    elif not isinstance(string, FmtStr):
+        raise ValueError(f"Bad Args: {string!r} (of type {type(string)})")
     return string.copy_with_new_atts(**atts)
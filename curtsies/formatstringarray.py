@@ -5,7 +5,7 @@ Format String 2D array
 
 -autoexpanding vertically
 -interesting get_item behavior (renders fmtstrs)
--caching behavior eventually
+-copy-on-write rows with per-row generations for cheap change detection
 
 
 >>> a = FSArray(10, 14)
@@ -19,6 +19,11 @@ Format String 2D array
 >>> a[200, 1] = ['i']
 >>> a[200, 1]
 ['i']
+>>> b = a.copy()
+>>> since = b.generation
+>>> b[5, 2:4] = ['xy']
+>>> b.changed_rows(since), b[5, 2:4], a[5, 2:4]
+([5], ['xy'], [''])
 """
 
 import itertools
@@ -39,7 +44,7 @@ from typing import (
     cast,
     no_type_check,
 )
-from collections.abc import Sequence
+from collections.abc import Iterator, MutableSequence, Sequence
 
 logger = logging.getLogger(__name__)
 
@@ -53,16 +58,94 @@ def slicesize(s: slice) -> int:
 class FSArray(Sequence):
     """A 2D array of colored text.
 
-    Internally represented by a list of FmtStrs of identical size."""
+    Internally represented by a list of FmtStrs of identical size.
+
+    The list of rows is shared between copies until one of them is modified,
+    and every row is stamped with the generation of the array when it was
+    last replaced, so renderers can find changed rows without comparing them."""
 
     # TODO add constructor that takes fmtstrs instead of dims
     def __init__(
         self, num_rows: int, num_columns: int, *args: Any, **kwargs: Any
     ) -> None:
         self.saved_args, self.saved_kwargs = args, kwargs
-        self.rows: list[FmtStr] = [fmtstr("", *args, **kwargs) for _ in range(num_rows)]
+        self._rows: list[FmtStr] = [
+            fmtstr("", *args, **kwargs) for _ in range(num_rows)
+        ]
+        self._row_generations: list[int] = [0] * num_rows
+        self._shared = False
+        self.generation = 0
         self.num_columns = num_columns
 
+    @property
+    def rows(self) -> "MutableSequence[FmtStr]":
+        """A view of the rows.
+
+        Reading from it has no side effects; assigning to a row through it
+        marks only that row as changed."""
+        return _RowsView(self)
+
+    @rows.setter
+    def rows(self, rows: "MutableSequence[FmtStr]") -> None:
+        self._rows = list(rows)
+        self._shared = False
+        self.generation += 1
+        self._row_generations = [self.generation] * len(self._rows)
+
+    def mutable_rows(self) -> list[FmtStr]:
+        """Returns the underlying list of rows for arbitrary modification.
+
+        Since the caller may change any row, every row is marked as changed."""
+        self._unshare()
+        self.generation += 1
+        self._row_generations = [self.generation] * len(self._rows)
+        return self._rows
+
+    def _sync_generations(self) -> None:
+        # rows may have been added or removed through mutable_rows()
+        if len(self._row_generations) != len(self._rows):
+            self.generation += 1
+            self._row_generations = [self.generation] * len(self._rows)
+
+    def _unshare(self) -> None:
+        self._sync_generations()
+        if self._shared:
+            self._rows = list(self._rows)
+            self._row_generations = list(self._row_generations)
+            self._shared = False
+
+    def _replace_rows(self, start: int, new_rows: list[FmtStr]) -> None:
+        """Replaces rows starting at start, stamping those that changed"""
+        self._unshare()
+        self.generation += 1
+        rows, generations = self._rows, self._row_generations
+        for i, row in enumerate(new_rows, start):
+            if rows[i] is not row:
+                rows[i] = row
+                generations[i] = self.generation
+
+    def copy(self) -> "FSArray":
+        """Returns a copy sharing rows with this FSArray until either is modified"""
+        self._sync_generations()
+        other = FSArray.__new__(FSArray)
+        other.saved_args, other.saved_kwargs = self.saved_args, self.saved_kwargs
+        other._rows = self._rows
+        other._row_generations = self._row_generations
+        other.generation = self.generation
+        other.num_columns = self.num_columns
+        self._shared = other._shared = True
+        return other
+
+    def row_generation(self, row: int) -> int:
+        """The generation in which row was last changed"""
+        self._sync_generations()
+        return self._row_generations[row]
+
+    def changed_rows(self, since: int) -> list[int]:
+        """Returns indices of rows changed after generation since"""
+        self._sync_generations()
+        return [i for i, gen in enumerate(self._row_generations) if gen > since]
+
     @overload
     def __getitem__(self, slicetuple: int) -> FmtStr:
         pass
@@ -80,31 +163,34 @@ class FSArray(Sequence):
     ) -> FmtStr | list[FmtStr]:
         if isinstance(slicetuple, int):
             if slicetuple < 0:
-                slicetuple = len(self.rows) - slicetuple
-            if slicetuple < 0 or slicetuple >= len(self.rows):
+                slicetuple = len(self._rows) - slicetuple
+            if slicetuple < 0 or slicetuple >= len(self._rows):
                 raise IndexError("out of bounds")
-            return self.rows[slicetuple]
+            return self._rows[slicetuple]
         if isinstance(slicetuple, slice):
-            rowslice = normalize_slice(len(self.rows), slicetuple)
-            return self.rows[rowslice]
+            rowslice = normalize_slice(len(self._rows), slicetuple)
+            return self._rows[rowslice]
         row_slice_or_int, col_slice_or_int = slicetuple
-        rowslice = normalize_slice(len(self.rows), row_slice_or_int)
+        rowslice = normalize_slice(len(self._rows), row_slice_or_int)
         colslice = normalize_slice(self.num_columns, col_slice_or_int)
         # TODO clean up slices
-        return [fs[colslice] for fs in self.rows[rowslice]]
+        return [fs[colslice] for fs in self._rows[rowslice]]
+
+    def __iter__(self) -> Iterator[FmtStr]:
+        return iter(self._rows)
 
     def __len__(self) -> int:
-        return len(self.rows)
+        return len(self._rows)
 
     @property
     def shape(self) -> tuple[int, int]:
         """Tuple of (len(rows, len(num_columns)) numpy-style shape"""
-        return len(self.rows), self.num_columns
+        return len(self._rows), self.num_columns
 
     @property
     def height(self) -> int:
         """The number of rows"""
-        return len(self.rows)
+        return len(self._rows)
 
     @property
     def width(self) -> int:
@@ -124,7 +210,9 @@ class FSArray(Sequence):
                 )
         elif isinstance(slicetuple, int):
             normalize_slice(self.height, slicetuple)
-            self.rows[slicetuple] = value
+            if slicetuple < 0:
+                slicetuple += len(self._rows)
+            self._replace_rows(slicetuple, [value])
             return
         else:
             rowslice, colslice = slicetuple
@@ -134,13 +222,17 @@ class FSArray(Sequence):
             value = [fmtstr("".join(line)) for line in value]
 
         rowslice = normalize_slice(sys.maxsize, rowslice)
-        additional_rows = max(0, rowslice.stop - len(self.rows))
-        self.rows.extend(
-            [
-                fmtstr("", *self.saved_args, **self.saved_kwargs)
-                for _ in range(additional_rows)
-            ]
-        )
+        additional_rows = max(0, rowslice.stop - len(self._rows))
+        if additional_rows:
+            self._unshare()
+            self.generation += 1
+            self._rows.extend(
+                [
+                    fmtstr("", *self.saved_args, **self.saved_kwargs)
+                    for _ in range(additional_rows)
+                ]
+            )
+            self._row_generations.extend([self.generation] * additional_rows)
         logger.debug("num columns: %r", self.num_columns)
         logger.debug("colslice: %r", colslice)
         colslice = normalize_slice(self.num_columns, colslice)
@@ -165,19 +257,19 @@ class FSArray(Sequence):
                 rowslice
             )
             grid_fsarray = (
-                self.rows[: rowslice.start]
+                self._rows[: rowslice.start]
                 + [
                     fs.setslice_with_length(
                         colslice.start, colslice.stop, v, self.num_columns
                     )
-                    for fs, v in zip(self.rows[rowslice], grid_value)
+                    for fs, v in zip(self._rows[rowslice], grid_value)
                 ]
-                + self.rows[rowslice.stop :]
+                + self._rows[rowslice.stop :]
             )
             msg = "You are trying to fit this value {} into the region {}: {}".format(
                 fmtstr("".join(value), bg="cyan"),
                 fmtstr("").join(grid_value),
-                "\n ".join(grid_fsarray[x] for x in range(len(self.rows))),
+                "\n ".join(grid_fsarray[x] for x in range(len(self._rows))),
             )
             raise ValueError(
                 """Error you are trying to replace a region of {} rows by {}
@@ -192,20 +284,19 @@ class FSArray(Sequence):
                     msg,
                 )
             )
-        self.rows = (
-            self.rows[: rowslice.start]
-            + [
+        self._replace_rows(
+            rowslice.start,
+            [
                 fs.setslice_with_length(
                     colslice.start, colslice.stop, v, self.num_columns
                 )
-                for fs, v in zip(self.rows[rowslice], value)
-            ]
-            + self.rows[rowslice.stop :]
+                for fs, v in zip(self._rows[rowslice], value)
+            ],
         )
 
     def dumb_display(self) -> None:
         """Prints each row followed by a newline without regard for the terminal window size"""
-        for line in self.rows:
+        for line in self._rows:
             print(line)
 
     @classmethod
@@ -253,6 +344,67 @@ class FSArray(Sequence):
         )
 
 
+class _RowsView(MutableSequence):
+    """The rows of an FSArray, with writes recorded as row changes
+
+    Compares equal to, and can be added to, lists like the list of rows
+    it replaces."""
+
+    def __init__(self, array: FSArray) -> None:
+        self._array = array
+
+    @overload
+    def __getitem__(self, index: int) -> FmtStr:
+        pass
+
+    @overload
+    def __getitem__(self, index: slice) -> list[FmtStr]:
+        pass
+
+    def __getitem__(self, index: int | slice) -> FmtStr | list[FmtStr]:
+        return self._array._rows[index]
+
+    @no_type_check
+    def __setitem__(self, index, value):
+        if isinstance(index, int):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("out of bounds")
+            self._array._replace_rows(index, [value])
+        else:
+            self._array.mutable_rows()[index] = value
+
+    def __delitem__(self, index: int | slice) -> None:
+        del self._array.mutable_rows()[index]
+
+    def insert(self, index: int, value: FmtStr) -> None:
+        self._array.mutable_rows().insert(index, value)
+
+    def __len__(self) -> int:
+        return len(self._array._rows)
+
+    def __iter__(self) -> Iterator[FmtStr]:
+        return iter(self._array._rows)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return self._array._rows == list(other)
+        return NotImplemented
+
+    def __add__(self, other: Sequence[FmtStr]) -> list[FmtStr]:
+        return self._array._rows + list(other)
+
+    def __radd__(self, other: Sequence[FmtStr]) -> list[FmtStr]:
+        return list(other) + self._array._rows
+
+    def copy(self) -> list[FmtStr]:
+        return list(self._array._rows)
+
+    def __repr__(self) -> str:
+        return repr(self._array._rows)
+
+
 def fsarray(
     strings: Sequence[FmtStr | str],
     width: int | None = None,
@@ -276,7 +428,7 @@ def fsarray(
     rows = [
         fs.setslice_with_length(0, len(s), s, width)
         for fs, s in zip(
-            arr.rows,
+            arr,
             (
                 s if isinstance(s, FmtStr) else fmtstr(s, *args, **kwargs)
                 for s in strings
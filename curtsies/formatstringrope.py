@@ -0,0 +1,299 @@
+"""
+Rope backed format strings for cheap edits of long colored strings
+
+A RopeFmtStr keeps its chunks in a balanced tree annotated with the length
+and display width of each subtree, so splice, slicing, append and
+width_at_offset take time logarithmic in the number of chunks instead of
+walking and rebuilding the whole chunk list.
+
+RopeFmtStr is a standalone alternative to FmtStr: nothing in curtsies
+creates one, and FmtStr, FSArray and the windows keep using chunk lists.
+Code which repeatedly edits a long line, like a REPL's input buffer, can
+convert it once with RopeFmtStr.from_fmtstr and edit the rope instead.
+
+>>> s = RopeFmtStr.from_fmtstr(fmtstr('hello', 'red') + ' ' + fmtstr('world', 'blue'))
+>>> s.splice('there', 6, 11)
+red('hello')+' '+'there'
+>>> s[3:8]
+red('lo')+' '+blue('wo')
+>>> s.append('!').width_at_offset(12)
+12
+"""
+
+from typing import Any, Optional, Union
+from collections.abc import Iterable
+
+from .formatstring import Chunk, FmtStr, fmtstr, normalize_slice, str_width
+
+
+class RopeNode:
+    """Immutable rope node, either a leaf holding a Chunk or the
+    concatenation of two nodes.
+
+    Subject to change, not part of the API"""
+
+    __slots__ = ("left", "right", "chunk", "length", "height", "_width")
+
+    def __init__(
+        self,
+        left: Optional["RopeNode"] = None,
+        right: Optional["RopeNode"] = None,
+        chunk: Chunk | None = None,
+    ) -> None:
+        self.left = left
+        self.right = right
+        self.chunk = chunk
+        self._width: int | None = None
+        if chunk is not None:
+            self.length = len(chunk)
+            self.height = 1
+        else:
+            assert left is not None and right is not None
+            self.length = left.length + right.length
+            self.height = max(left.height, right.height) + 1
+
+    @property
+    def width(self) -> int:
+        """Display width of the subtree, or -1 if it contains unprintable characters"""
+        if self._width is None:
+            if self.chunk is not None:
+                self._width = self.chunk.raw_width
+            else:
+                assert self.left is not None and self.right is not None
+                left, right = self.left.width, self.right.width
+                self._width = -1 if left == -1 or right == -1 else left + right
+        return self._width
+
+    def chunks(self) -> Iterable[Chunk]:
+        stack: list[RopeNode] = [self]
+        while stack:
+            node = stack.pop()
+            if node.chunk is not None:
+                yield node.chunk
+            else:
+                assert node.left is not None and node.right is not None
+                stack.append(node.right)
+                stack.append(node.left)
+
+
+def build(chunks: list[Chunk]) -> RopeNode | None:
+    """Returns a balanced rope of chunks"""
+
+    def build_range(start: int, stop: int) -> RopeNode:
+        if stop - start == 1:
+            return RopeNode(chunk=chunks[start])
+        middle = (start + stop) // 2
+        return RopeNode(build_range(start, middle), build_range(middle, stop))
+
+    return build_range(0, len(chunks)) if chunks else None
+
+
+def _rebalance(left: RopeNode, right: RopeNode) -> RopeNode:
+    """Concatenates two nodes whose heights differ by at most two"""
+    if left.height > right.height + 1:
+        assert left.left is not None and left.right is not None
+        if left.left.height >= left.right.height:
+            return RopeNode(left.left, RopeNode(left.right, right))
+        inner = left.right
+        assert inner.left is not None and inner.right is not None
+        return RopeNode(RopeNode(left.left, inner.left), RopeNode(inner.right, right))
+    if right.height > left.height + 1:
+        assert right.left is not None and right.right is not None
+        if right.right.height >= right.left.height:
+            return RopeNode(RopeNode(left, right.left), right.right)
+        inner = right.left
+        assert inner.left is not None and inner.right is not None
+        return RopeNode(RopeNode(left, inner.left), RopeNode(inner.right, right.right))
+    return RopeNode(left, right)
+
+
+def join(left: RopeNode | None, right: RopeNode | None) -> RopeNode | None:
+    """Concatenates two ropes, keeping the result balanced"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.height > right.height + 1:
+        assert left.left is not None
+        joined = join(left.right, right)
+        assert joined is not None
+        return _rebalance(left.left, joined)
+    if right.height > left.height + 1:
+        assert right.right is not None
+        joined = join(left, right.left)
+        assert joined is not None
+        return _rebalance(joined, right.right)
+    return RopeNode(left, right)
+
+
+def split(node: RopeNode | None, index: int) -> tuple[RopeNode | None, RopeNode | None]:
+    """Returns ropes of the characters before and after index"""
+    if node is None or index <= 0:
+        return None, node
+    if index >= node.length:
+        return node, None
+    if node.chunk is not None:
+        s, atts = node.chunk.s, node.chunk.atts
+        return (
+            RopeNode(chunk=Chunk(s[:index], atts)),
+            RopeNode(chunk=Chunk(s[index:], atts)),
+        )
+    assert node.left is not None and node.right is not None
+    if index < node.left.length:
+        before, after = split(node.left, index)
+        return before, join(after, node.right)
+    before, after = split(node.right, index - node.left.length)
+    return join(node.left, before), after
+
+
+class RopeFmtStr(FmtStr):
+    """A FmtStr stored as a balanced rope of chunks.
+
+    Edits return new RopeFmtStrs which share most of their nodes with
+    the original, so editing a long string costs O(log n) in the number of
+    chunks. Operations without a rope-specific implementation fall back
+    to the chunk list and return plain FmtStrs."""
+
+    def __init__(self, *components: Chunk) -> None:
+        self._root = build(list(components))
+        self._chunks: list[Chunk] | None = None
+        self._unicode: str | None = None
+        self._len: int | None = None
+        self._s: str | None = None
+        self._width: int | None = None
+        self._divides: list[int] | None = None
+        self._width_divides: list[int] | None = None
+        self._sgr_str: str | None = None
+
+    @classmethod
+    def from_root(cls, root: RopeNode | None) -> "RopeFmtStr":
+        if root is None:
+            return cls(Chunk(""))
+        rope = cls()
+        rope._root = root
+        return rope
+
+    @classmethod
+    def from_fmtstr(cls, fs: Union[str, FmtStr]) -> "RopeFmtStr":
+        """Returns a RopeFmtStr with the same chunks as fs"""
+        if isinstance(fs, RopeFmtStr):
+            return fs
+        if not isinstance(fs, FmtStr):
+            fs = fmtstr(fs)
+        return cls(*fs.chunks)
+
+    @property
+    def chunks(self) -> list[Chunk]:  # type: ignore[override]
+        if self._chunks is None:
+            self._chunks = [] if self._root is None else list(self._root.chunks())
+        return self._chunks
+
+    def __len__(self) -> int:
+        return 0 if self._root is None else self._root.length
+
+    @property
+    def width(self) -> int:
+        """The number of columns it would take to display this string."""
+        if self._root is not None and self._root.width != -1:
+            return self._root.width
+        return super().width
+
+    def width_at_offset(self, n: int) -> int:
+        """Returns the horizontal position of character n of the string"""
+        width = 0
+        node = self._root
+        while node is not None and node.chunk is None:
+            left, right = node.left, node.right
+            assert left is not None and right is not None
+            if n < left.length:
+                node = left
+                continue
+            if left.width == -1:
+                return super().width_at_offset(n)
+            width += left.width
+            n -= left.length
+            node = right
+        if node is not None and node.chunk is not None:
+            chunk_width = str_width(node.chunk.s[:n])
+            assert chunk_width != -1
+            width += chunk_width
+        return width
+
+    def splice(
+        self, new_str: Union[str, FmtStr], start: int, end: int | None = None
+    ) -> "RopeFmtStr":
+        """Returns a new RopeFmtStr with the input string spliced into the
+        the original at start and end.
+        If end is provided, new_str will replace the substring self.s[start:end-1].
+        """
+        if len(new_str) == 0:
+            return self
+        if end is None:
+            end = start
+        if not 0 <= start <= len(self) or end < start:
+            # rare, and FmtStr.splice has its own rules for these
+            spliced = FmtStr(*self.chunks).splice(new_str, start, end)
+            return RopeFmtStr(*spliced.chunks)
+        new_root = RopeFmtStr.from_fmtstr(new_str)._root
+        before, rest = split(self._root, start)
+        _, after = split(rest, end - start)
+        # FmtStr.splice drops empty chunks, e.g. of an empty string
+        if before is not None and before.length == 0:
+            before = None
+        if after is not None and after.length == 0:
+            after = None
+        return RopeFmtStr.from_root(join(join(before, new_root), after))
+
+    def append(self, string: Union[str, FmtStr]) -> "RopeFmtStr":
+        return self.splice(string, len(self))
+
+    def __getitem__(self, index: int | slice) -> "RopeFmtStr":
+        index = normalize_slice(len(self), index)
+        start, stop = max(0, index.start), min(len(self), index.stop)
+        if stop <= start:
+            # like FmtStr, keep the attributes of a chunk the slice is inside
+            found = self._chunk_at(index.start)
+            if found is not None and found[1] < index.stop:
+                return RopeFmtStr(Chunk("", found[0].atts))
+            return RopeFmtStr(Chunk(""))
+        rest, _ = split(self._root, stop)
+        _, middle = split(rest, start)
+        return RopeFmtStr.from_root(middle)
+
+    def _chunk_at(self, n: int) -> tuple[Chunk, int] | None:
+        """Returns the chunk containing character n and the index it starts at"""
+        if not 0 <= n < len(self):
+            return None
+        start = 0
+        node = self._root
+        while node is not None and node.chunk is None:
+            left, right = node.left, node.right
+            assert left is not None and right is not None
+            if n - start < left.length:
+                node = left
+            else:
+                start += left.length
+                node = right
+        assert node is not None and node.chunk is not None
+        return node.chunk, start
+
+    def __add__(self, other: Union[FmtStr, str]) -> "RopeFmtStr":
+        if isinstance(other, FmtStr):
+            return RopeFmtStr.from_root(
+                join(self._root, RopeFmtStr.from_fmtstr(other)._root)
+            )
+        elif isinstance(other, str):
+            return RopeFmtStr.from_root(join(self._root, RopeNode(chunk=Chunk(other))))
+        return NotImplemented
+
+    def __radd__(self, other: Union[FmtStr, str]) -> "RopeFmtStr":
+        if isinstance(other, FmtStr):
+            return RopeFmtStr.from_root(
+                join(RopeFmtStr.from_fmtstr(other)._root, self._root)
+            )
+        elif isinstance(other, str):
+            return RopeFmtStr.from_root(join(RopeNode(chunk=Chunk(other)), self._root))
+        return NotImplemented
+
+    def copy(self) -> "RopeFmtStr":
+        return RopeFmtStr.from_root(self._root)
@@ -1,3 +1,4 @@
+import asyncio
 import locale
 import logging
 import os
@@ -23,7 +24,14 @@ from typing import (
     Tuple,
     Any,
 )
-from collections.abc import Callable
+from collections.abc import (
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    MutableSequence,
+    Sequence,
+)
 from types import TracebackType, FrameType
 
 
@@ -32,6 +40,10 @@ READ_SIZE = 1024
 assert READ_SIZE >= events.MAX_KEYPRESS_SIZE
 # if a keypress could require more bytes than we read to be identified,
 # the paste logic that reads more data as needed might not work.
+# seconds to wait for the rest of a bracketed paste before giving up on it
+BRACKETED_PASTE_TIMEOUT = 0.5
+BRACKETED_PASTE_ON = "\x1b[?2004h"
+BRACKETED_PASTE_OFF = "\x1b[?2004l"
 
 
 def is_main_thread() -> bool:
@@ -54,6 +66,81 @@ class ReplacedSigIntHandler(ContextManager):
         signal.signal(signal.SIGINT, self.orig_sigint_handler)
 
 
+class UnprocessedBytes(MutableSequence):
+    """The bytes an Input has read but not processed yet, one per item
+
+    Works like the list of single bytes objects this used to be, but is a
+    view of the Input's buffer. bytes() of it returns them all at once."""
+
+    def __init__(self, inp: "Input") -> None:
+        self._input = inp
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("index out of range")
+        return self._input._offset + index
+
+    def __len__(self) -> int:
+        return len(self._input._buffer) - self._input._offset
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        i = self._index(index)
+        return bytes(self._input._buffer[i : i + 1])
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        if isinstance(index, slice):
+            items = list(self)
+            items[index] = value
+            self._input.unprocessed_bytes = items
+        else:
+            i = self._index(index)
+            self._input._buffer[i : i + 1] = value
+
+    def __delitem__(self, index: Any) -> None:
+        if isinstance(index, slice):
+            items = list(self)
+            del items[index]
+            self._input.unprocessed_bytes = items
+        elif self._index(index) == self._input._offset:
+            # e.g. pop(0), which used to be how bytes were taken off
+            self._input._consume(1)
+        else:
+            del self._input._buffer[self._index(index)]
+
+    def insert(self, index: int, value: bytes) -> None:
+        if index < 0:
+            index += len(self)
+        i = self._input._offset + max(0, min(len(self), index))
+        self._input._buffer[i:i] = value
+
+    def append(self, value: bytes) -> None:
+        self._input._append(value)
+
+    def extend(self, values: Iterable[bytes]) -> None:
+        self._input._append(b"".join(values))
+
+    def __iter__(self) -> Iterator[bytes]:
+        buffer = self._input._buffer
+        return (
+            bytes(buffer[i : i + 1]) for i in range(self._input._offset, len(buffer))
+        )
+
+    def __bytes__(self) -> bytes:
+        return bytes(self._input._buffer[self._input._offset :])
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, UnprocessedBytes):
+            return bytes(self) == bytes(other)
+        return isinstance(other, list) and list(self) == other
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
 class Input(ContextManager["Input"]):
     """Keypress and control event generator"""
 
@@ -66,6 +153,9 @@ class Input(ContextManager["Input"]):
         paste_threshold: int | None = events.MAX_KEYPRESS_SIZE + 1,
         sigint_event: bool = False,
         disable_terminal_start_stop: bool = False,
+        bracketed_paste: bool = False,
+        paste_chunk_size: int | None = None,
+        out_stream: TextIO | None = None,
     ) -> None:
         """Returns an Input instance.
 
@@ -81,12 +171,23 @@ class Input(ContextManager["Input"]):
             disable_terminal_start_stop (bool): If True, disable terminal
               start/stop using Ctrl-s/Ctrl-q, thus enabling these keys
               to be read as input by curtsies
+            bracketed_paste (bool): If True, turn on the terminal's
+              bracketed paste mode while in the context manager, so
+              pasted text is returned as one PasteEvent however long it is
+            paste_chunk_size (int): If set, bracketed pastes are returned
+              as PasteChunkEvents of at most this many bytes each, so long
+              ones aren't read into memory all at once
+            out_stream (file): Where the escape sequences turning
+              bracketed paste mode on and off are written, defaults to
+              sys.__stdout__
         """
         if in_stream is None:
             in_stream = sys.__stdin__
             assert in_stream is not None
         self.in_stream = in_stream
-        self.unprocessed_bytes: list[bytes] = []  # leftover from stdin, unprocessed yet
+        # leftover from stdin, unprocessed yet: the bytes of _buffer from _offset
+        self._buffer = bytearray()
+        self._offset = 0
         if isinstance(keynames, str):
             # TODO: Remove this block with the next API breaking release.
             if keynames == "curtsies":
@@ -99,9 +200,22 @@ class Input(ContextManager["Input"]):
                 raise ValueError("keyname is invalid")
         else:
             self.keynames = keynames
+        self.key_decoder: events.KeyDecoder | None = None
         self.paste_threshold = paste_threshold
         self.sigint_event = sigint_event
         self.disable_terminal_start_stop = disable_terminal_start_stop
+        if (
+            paste_chunk_size is not None
+            and paste_chunk_size <= events.MAX_KEYPRESS_SIZE
+        ):
+            raise ValueError("paste_chunk_size must be more than the longest keypress")
+        self.bracketed_paste = bracketed_paste
+        self.paste_chunk_size = paste_chunk_size
+        self._paste_in_progress = False
+        if out_stream is None:
+            out_stream = sys.__stdout__
+            assert out_stream is not None
+        self.out_stream = out_stream
         self.sigints: list[events.SigIntEvent] = []
         self.wakeup_read_fd: int | None = None
         self.wakeup_write_fd: int | None = None
@@ -133,6 +247,27 @@ class Input(ContextManager["Input"]):
             tty_cc[VDSUSP] = 0
             termios.tcsetattr(self.in_stream, termios.TCSANOW, attrs)
 
+        self._install_signal_handlers()
+
+        if self.bracketed_paste:
+            self.out_stream.write(BRACKETED_PASTE_ON)
+            self.out_stream.flush()
+
+        return self
+
+    def __exit__(
+        self,
+        type: type[BaseException] | None = None,
+        value: BaseException | None = None,
+        traceback: TracebackType | None = None,
+    ) -> None:
+        self._remove_signal_handlers()
+        if self.bracketed_paste:
+            self.out_stream.write(BRACKETED_PASTE_OFF)
+            self.out_stream.flush()
+        termios.tcsetattr(self.in_stream, termios.TCSANOW, self.original_stty)
+
+    def _install_signal_handlers(self) -> None:
         if self.sigint_event and is_main_thread():
             self.orig_sigint_handler = signal.getsignal(signal.SIGINT)
             signal.signal(signal.SIGINT, self.sigint_handler)
@@ -144,14 +279,7 @@ class Input(ContextManager["Input"]):
             os.set_blocking(wfd, False)
             signal.set_wakeup_fd(wfd, warn_on_full_buffer=False)
 
-        return self
-
-    def __exit__(
-        self,
-        type: type[BaseException] | None = None,
-        value: BaseException | None = None,
-        traceback: TracebackType | None = None,
-    ) -> None:
+    def _remove_signal_handlers(self) -> None:
         if (
             self.sigint_event
             and is_main_thread()
@@ -164,7 +292,6 @@ class Input(ContextManager["Input"]):
                 os.close(self.wakeup_read_fd)
             if self.wakeup_write_fd is not None:
                 os.close(self.wakeup_write_fd)
-        termios.tcsetattr(self.in_stream, termios.TCSANOW, self.original_stty)
 
     def sigint_handler(
         self, signum: signal.Signals | int, frame: FrameType | None
@@ -177,13 +304,50 @@ class Input(ContextManager["Input"]):
     def __next__(self) -> None | str | events.Event:
         return self.send(None)
 
+    @property
+    def unprocessed_bytes(self) -> UnprocessedBytes:
+        """Bytes read from in_stream not yet turned into events"""
+        return UnprocessedBytes(self)
+
+    @unprocessed_bytes.setter
+    def unprocessed_bytes(self, value: bytes | Sequence[bytes]) -> None:
+        if not isinstance(value, (bytes, bytearray)):
+            value = b"".join(value)
+        self._buffer = bytearray(value)
+        self._offset = 0
+
     def unget_bytes(self, string: bytes) -> None:
         """Adds bytes to be internal buffer to be read
 
         This method is for reporting bytes from an in_stream read
         not initiated by this Input object"""
 
-        self.unprocessed_bytes.extend(string[i : i + 1] for i in range(len(string)))
+        self._append(string)
+
+    def _append(self, data: bytes) -> None:
+        # drop consumed bytes once they're at least half the buffer, which
+        # keeps the cost of moving the unread ones constant per byte
+        if self._offset >= len(self._buffer) - self._offset:
+            del self._buffer[: self._offset]
+            self._offset = 0
+        self._buffer += data
+
+    def _consume(self, size: int) -> None:
+        """Moves the read offset of the buffer past size bytes
+
+        Offsets into the buffer stay valid until more bytes are added."""
+        self._offset = min(self._offset + size, len(self._buffer))
+
+    def _key_decoder(self) -> events.KeyDecoder:
+        encoding = getpreferredencoding()
+        decoder = self.key_decoder
+        if (
+            decoder is None
+            or decoder.encoding != encoding
+            or decoder.keynames != self.keynames
+        ):
+            decoder = self.key_decoder = events.KeyDecoder(encoding, self.keynames)
+        return decoder
 
     def _wait_for_read_ready_or_timeout(
         self, timeout: float | int | None
@@ -195,7 +359,7 @@ class Input(ContextManager["Input"]):
         If stdin is ready, either there are bytes to read or a SIGTSTP
         triggered by dsusp has been received"""
         remaining_timeout = timeout
-        t0 = time.time()
+        deadline = None if timeout is None else time.monotonic() + timeout
         while True:
             try:
                 (rs, _, _) = select.select(
@@ -220,8 +384,8 @@ class Input(ContextManager["Input"]):
                     os.read(r, 1024)
                     if self.queued_interrupting_events:
                         return False, self.queued_interrupting_events.pop(0)
-                    elif remaining_timeout is not None:
-                        remaining_timeout = max(0, t0 + remaining_timeout - time.time())
+                    elif deadline is not None:
+                        remaining_timeout = max(0, deadline - time.monotonic())
                         continue
                     else:
                         continue
@@ -229,8 +393,8 @@ class Input(ContextManager["Input"]):
             except OSError:
                 if self.sigints:
                     return False, self.sigints.pop()
-                if remaining_timeout is not None:
-                    remaining_timeout = max(remaining_timeout - (time.time() - t0), 0)
+                if deadline is not None:
+                    remaining_timeout = max(0, deadline - time.monotonic())
 
     def send(self, timeout: float | None | None = None) -> None | str | events.Event:
         """Returns an event or None if no events occur before timeout."""
@@ -240,30 +404,91 @@ class Input(ContextManager["Input"]):
         else:
             return self._send(timeout)
 
-    def _send(self, timeout: float | int | None) -> None | str | events.Event:
-        def find_key() -> str | None:
-            """Returns keypress identified by adding unprocessed bytes or None"""
-            current_bytes = []
-            while self.unprocessed_bytes:
-                current_bytes.append(self.unprocessed_bytes.pop(0))
-                e = events.get_key(
-                    current_bytes,
-                    getpreferredencoding(),
-                    keynames=self.keynames,
-                    full=len(self.unprocessed_bytes) == 0,
-                )
-                if e is not None:
-                    return e
-            if current_bytes:  # incomplete keys shouldn't happen
-                raise ValueError("Couldn't identify key sequence: %r" % current_bytes)
+    def _find_key(
+        self, decoder: events.KeyDecoder, stop: int | None = None, full: bool = True
+    ) -> str | None:
+        """Returns keypress identified by adding unprocessed bytes or None
+
+        Only bytes before stop are used. If not full, None is also returned
+        for bytes at the end which could be the start of a longer key."""
+        start = self._offset
+        if stop is None:
+            stop = len(self._buffer)
+        if start >= stop:
             return None
+        try:
+            e, end = decoder.next_key(self._buffer, start, full, stop)
+        except UnicodeDecodeError as error:
+            self._consume(len(error.object))
+            raise
+        except ValueError:
+            self._consume(events.MAX_KEYPRESS_SIZE + 1)
+            raise
+        if e is None:
+            if not full:
+                return None
+            # incomplete keys shouldn't happen
+            current_bytes = bytes(self._buffer[start:stop])
+            self._consume(len(current_bytes))
+            raise ValueError("Couldn't identify key sequence: %r" % current_bytes)
+        self._consume(end - start)
+        return e
+
+    def _add_to_paste(
+        self,
+        paste: events.PasteEvent,
+        decoder: events.KeyDecoder,
+        stop: int | None = None,
+        full: bool = True,
+    ) -> bool:
+        """Moves the keys of unprocessed bytes before stop into paste
+
+        Returns whether any keys were added. Plain text is decoded a run at
+        a time rather than key by key."""
+        if stop is None:
+            stop = len(self._buffer)
+        added = False
+        while self._offset < stop:
+            text, end = decoder.text_run(self._buffer, self._offset, stop)
+            if text:
+                paste.add_text(text)
+                self._consume(end - self._offset)
+            else:
+                start = self._offset
+                e = self._find_key(decoder, stop, full)
+                if e is None:
+                    break
+                key_bytes = self._buffer[start : self._offset]
+                paste.add_key(e, str(key_bytes, decoder.encoding, "replace"))
+            added = True
+        return added
 
+    def _send(self, timeout: float | int | None) -> None | str | events.Event:
+        decoder = self._key_decoder()
+        found, e, time_until_check = self._event_before_read(decoder, timeout)
+        if not found:
+            stdin_ready_for_read, event = self._wait_for_read_ready_or_timeout(
+                time_until_check
+            )
+            e = self._event_after_wait(decoder, stdin_ready_for_read, event)
+        if e is None and self._paste_starts():
+            return self._bracketed_paste(decoder)
+        return e
+
+    def _event_before_read(
+        self, decoder: events.KeyDecoder, timeout: float | int | None
+    ) -> tuple[bool, None | str | events.Event, float | int | None]:
+        """Returns whether an event is ready without reading in_stream,
+        that event, and otherwise how long to wait for input
+
+        A bracketed paste is left to be read by the caller, found being
+        True with no event."""
         if self.sigints:
-            return self.sigints.pop()
+            return True, self.sigints.pop(), timeout
         if self.queued_events:
-            return self.queued_events.pop(0)
+            return True, self.queued_events.pop(0), timeout
         if self.queued_interrupting_events:
-            return self.queued_interrupting_events.pop(0)
+            return True, self.queued_interrupting_events.pop(0), timeout
 
         if self.queued_scheduled_events:
             self.queued_scheduled_events.sort()
@@ -274,7 +499,7 @@ class Input(ContextManager["Input"]):
                     self.queued_scheduled_events[0],
                     self.queued_scheduled_events[1:],
                 )
-                return self.queued_scheduled_events.pop(0)[1]
+                return True, self.queued_scheduled_events.pop(0)[1], timeout
             else:
                 time_until_check = min(
                     max(0, when - time.time()),
@@ -284,19 +509,30 @@ class Input(ContextManager["Input"]):
             time_until_check = timeout
 
         # try to find an already pressed key from prev input
-        e = find_key()
-        if e is not None:
-            return e
+        if self._paste_starts():
+            return True, None, time_until_check
+        self._skip_paste_end()
+        e = self._find_key(decoder, self._paste_start())
+        return e is not None, e, time_until_check
 
-        stdin_ready_for_read, event = self._wait_for_read_ready_or_timeout(
-            time_until_check
-        )
+    def _event_after_wait(
+        self,
+        decoder: events.KeyDecoder,
+        stdin_ready_for_read: bool,
+        event: events.Event | str | None,
+    ) -> None | str | events.Event:
+        """Returns the event from waiting for input, a scheduled event now
+        due, or the next event read from in_stream
+
+        None is returned if a bracketed paste was read, leaving the paste
+        to the caller."""
         if event:
             return event
         if (
-            self.queued_scheduled_events and when < time.time()
-        ):  # when should always be defined
-            # because queued_scheduled_events should not be modified during this time
+            self.queued_scheduled_events
+            and min(when for when, _ in self.queued_scheduled_events) < time.time()
+        ):
+            self.queued_scheduled_events.sort()
             logger.debug(
                 "popping an event! %r %r",
                 self.queued_scheduled_events[0],
@@ -312,30 +548,127 @@ class Input(ContextManager["Input"]):
             # when SIGTSTP was send by dsusp
             return None
 
+        if self._paste_starts():
+            return None
+        self._skip_paste_end()
+        if self._offset == len(self._buffer):
+            return None
+        # keys typed just before a bracketed paste are returned as keys
+        stop = self._paste_start()
+        num_bytes = min(num_bytes, stop - self._offset)
         if self.paste_threshold is not None and num_bytes > self.paste_threshold:
-            paste = events.PasteEvent()
+            paste = events.PasteEvent(decoder.char_keys)
             while True:
-                if len(self.unprocessed_bytes) < events.MAX_KEYPRESS_SIZE:
+                if len(self._buffer) - self._offset < events.MAX_KEYPRESS_SIZE:
                     self._nonblocking_read()  # may need to read to get the rest of a keypress
-                e = find_key()
-                if e is None:
+                # a bracketed paste is an event of its own
+                stop = self._buffer.find(events.PASTE_START, self._offset)
+                if stop == self._offset:
+                    return paste
+                if stop == -1:
+                    stop = len(self._buffer)
+                # keys which more bytes could make longer are left until there
+                # are no more bytes to read
+                if self._add_to_paste(paste, decoder, stop, full=False):
+                    continue
+                if self._nonblocking_read():
+                    continue
+                if not self._add_to_paste(paste, decoder, stop):
                     return paste
-                else:
-                    paste.events.append(e)
         else:
-            e = find_key()
+            e = self._find_key(decoder, stop)
             assert e is not None
             return e
 
+    def _paste_starts(self) -> bool:
+        """Returns whether unprocessed bytes continue or start a bracketed paste"""
+        return self._paste_in_progress or self._buffer.startswith(
+            events.PASTE_START, self._offset
+        )
+
+    def _paste_start(self) -> int:
+        """Returns where the next bracketed paste starts in the unprocessed
+        bytes, or their end if none does"""
+        start = self._buffer.find(events.PASTE_START, self._offset)
+        return len(self._buffer) if start == -1 else start
+
+    def _skip_paste_end(self) -> None:
+        """Drops the end marker of a bracketed paste given up on after
+        BRACKETED_PASTE_TIMEOUT"""
+        if self.bracketed_paste and self._buffer.startswith(
+            events.PASTE_END, self._offset
+        ):
+            self._consume(len(events.PASTE_END))
+
+    def _bracketed_paste(self, decoder: events.KeyDecoder) -> events.PasteEvent:
+        """Returns the keys between the bracketed paste markers at the start
+        of unprocessed bytes as a paste event
+
+        Reads until the end marker arrives, or no more bytes do for
+        BRACKETED_PASTE_TIMEOUT seconds. If paste_chunk_size is set the
+        paste is returned as PasteChunkEvents of at most that many bytes,
+        the rest of it being read by the following calls."""
+        steps = self._bracketed_paste_steps(decoder)
+        try:
+            next(steps)
+            while True:
+                steps.send(
+                    self._wait_for_read_ready_or_timeout(BRACKETED_PASTE_TIMEOUT)
+                )
+        except StopIteration as stop:
+            return cast(events.PasteEvent, stop.value)
+
+    def _bracketed_paste_steps(
+        self, decoder: events.KeyDecoder
+    ) -> Generator[None, tuple[bool, events.Event | str | None], events.PasteEvent]:
+        """Reads a bracketed paste like _bracketed_paste, yielding to be sent
+        the result of waiting for more of it to be ready to read"""
+        paste: events.PasteEvent
+        if self.paste_chunk_size is None:
+            paste = events.PasteEvent(decoder.char_keys)
+        else:
+            paste = events.PasteChunkEvent(decoder.char_keys)
+        if not self._paste_in_progress:
+            self._consume(len(events.PASTE_START))
+        self._paste_in_progress = False
+        size = 0  # bytes of the paste in this event
+        while True:
+            start = self._offset
+            end = self._buffer.find(events.PASTE_END, start)
+            stop = len(self._buffer) if end == -1 else end
+            if (
+                self.paste_chunk_size is not None
+                and size + stop - start > self.paste_chunk_size
+            ):
+                stop = start + self.paste_chunk_size - size
+                self._add_to_paste(paste, decoder, stop, full=False)
+                self._paste_in_progress = True
+                return paste
+            if end != -1:
+                self._add_to_paste(paste, decoder, end)
+                self._consume(len(events.PASTE_END))
+                break
+            self._add_to_paste(paste, decoder, full=False)
+            size += self._offset - start
+            ready, event = yield
+            if event is not None:
+                self.queued_interrupting_events.insert(0, event)
+            if not ready or not self._nonblocking_read():
+                self._add_to_paste(paste, decoder)
+                break
+        if isinstance(paste, events.PasteChunkEvent):
+            paste.final = True
+        return paste
+
     def _nonblocking_read(self) -> int:
-        """Returns the number of characters read and adds them to self.unprocessed_bytes"""
+        """Returns the number of bytes read and adds them to self.unprocessed_bytes"""
         with Nonblocking(self.in_stream):
             try:
                 data = os.read(self.in_stream.fileno(), READ_SIZE)
             except BlockingIOError:
                 return 0
             if data:
-                self.unprocessed_bytes.extend(data[i : i + 1] for i in range(len(data)))
+                self._append(data)
                 return len(data)
             else:
                 return 0
@@ -350,6 +683,7 @@ class Input(ContextManager["Input"]):
 
         def callback(**kwargs: Any) -> None:
             self.queued_events.append(event_type(**kwargs))  # type: ignore
+            self._event_queued()
 
         return callback
 
@@ -363,9 +697,17 @@ class Input(ContextManager["Input"]):
 
         def callback(when: float) -> None:
             self.queued_scheduled_events.append((when, event_type(when=when)))
+            self._event_queued()
 
         return callback
 
+    def _event_queued(self) -> None:
+        """Called after event_trigger or scheduled_event_trigger callbacks
+        queue an event
+
+        Nothing needs doing here, as these callbacks can't run while a send
+        on the same thread is waiting."""
+
     def threadsafe_event_trigger(
         self, event_type: type[events.Event] | Callable[..., None]
     ) -> Callable[..., None]:
@@ -389,6 +731,137 @@ class Input(ContextManager["Input"]):
         return callback
 
 
+class AsyncInput(Input):
+    """Keypress and control event generator for asyncio
+
+    Waits for input with the running event loop instead of select, so
+    events can be awaited from coroutines alongside other work:
+
+        with AsyncInput() as input_generator:
+            async for e in input_generator:
+                ...
+
+    Scheduled events and those of event_trigger and
+    threadsafe_event_trigger are returned as they are by Input, those
+    queued while an asend is waiting waking it. With sigint_event SIGINT
+    is handled by the event loop, so the Input must be entered while the
+    loop is running."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._waiter: asyncio.Future[int] | None = None
+
+    def _install_signal_handlers(self) -> None:
+        # the event loop does its own wakeups, so only SIGINT needs handling
+        if self.sigint_event and is_main_thread():
+            self._loop = asyncio.get_running_loop()
+            self._loop.add_signal_handler(signal.SIGINT, self._async_sigint_handler)
+
+    def _remove_signal_handlers(self) -> None:
+        if self._loop is not None:
+            self._loop.remove_signal_handler(signal.SIGINT)
+            self._loop = None
+
+    def _async_sigint_handler(self) -> None:
+        self.sigints.append(events.SigIntEvent())
+        self._event_queued()
+
+    def _event_queued(self) -> None:
+        if self._waiter is not None:
+            _set_result_once(self._waiter, -1)
+
+    async def __aenter__(self) -> "AsyncInput":
+        self.__enter__()
+        return self
+
+    async def __aexit__(
+        self,
+        type: type[BaseException] | None = None,
+        value: BaseException | None = None,
+        traceback: TracebackType | None = None,
+    ) -> None:
+        self.__exit__(type, value, traceback)
+
+    def __aiter__(self) -> "AsyncInput":
+        return self
+
+    async def __anext__(self) -> None | str | events.Event:
+        return await self.asend(None)
+
+    async def asend(self, timeout: float | None = None) -> None | str | events.Event:
+        """Returns an event or None if no events occur before timeout."""
+        decoder = self._key_decoder()
+        found, e, time_until_check = self._event_before_read(decoder, timeout)
+        if not found:
+            stdin_ready_for_read, event = await self._wait_for_read_ready(
+                time_until_check
+            )
+            e = self._event_after_wait(decoder, stdin_ready_for_read, event)
+        if e is None and self._paste_starts():
+            return await self._async_bracketed_paste(decoder)
+        return e
+
+    async def _async_bracketed_paste(
+        self, decoder: events.KeyDecoder
+    ) -> events.PasteEvent:
+        """Returns a bracketed paste like _bracketed_paste, awaiting the
+        rest of it with the event loop"""
+        steps = self._bracketed_paste_steps(decoder)
+        try:
+            next(steps)
+            while True:
+                steps.send(await self._wait_for_read_ready(BRACKETED_PASTE_TIMEOUT))
+        except StopIteration as stop:
+            return cast(events.PasteEvent, stop.value)
+
+    async def _wait_for_read_ready(
+        self, timeout: float | int | None
+    ) -> tuple[bool, events.Event | str | None]:
+        """Returns tuple of whether stdin is ready to read and an event,
+        like _wait_for_read_ready_or_timeout but without blocking the loop"""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        fds = [self.in_stream.fileno()] + self.readers
+        while True:
+            if self.sigints:
+                return False, self.sigints.pop()
+            waiter = self._waiter = loop.create_future()
+            for fd in fds:
+                loop.add_reader(fd, _set_result_once, waiter, fd)
+            try:
+                remaining = (
+                    None if deadline is None else max(0, deadline - time.monotonic())
+                )
+                done, _ = await asyncio.wait([waiter], timeout=remaining)
+            finally:
+                for fd in fds:
+                    loop.remove_reader(fd)
+                self._waiter = None
+            if not done:
+                return False, None
+            r = waiter.result()
+            if r == -1:
+                # woken by a queued event
+                if self.queued_events:
+                    return False, self.queued_events.pop(0)
+                if self.queued_scheduled_events:
+                    first = min(when for when, _ in self.queued_scheduled_events)
+                    due = time.monotonic() + max(0, first - time.time())
+                    deadline = due if deadline is None else min(deadline, due)
+            elif r == self.in_stream.fileno():
+                return True, None
+            elif r in self.readers:
+                os.read(r, 1024)
+                if self.queued_interrupting_events:
+                    return False, self.queued_interrupting_events.pop(0)
+
+
+def _set_result_once(future: "asyncio.Future[int]", result: int) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
 def getpreferredencoding() -> str:
     return locale.getpreferredencoding() or sys.getdefaultencoding()
 
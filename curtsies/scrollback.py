@@ -0,0 +1,87 @@
+"""
+Scrollback buffer for content taller than the terminal
+
+A Scrollback holds logical lines, which may be longer than the terminal is
+wide, and produces the rows of whichever part of them is on screen. Lines
+are wrapped only once they are displayed, and the rows of each line are
+remembered, so drawing the bottom of a long history takes time
+proportional to the number of visible rows.
+
+>>> history = Scrollback(['first', fmtstr('second line', 'red'), 'third'])
+>>> history.view(rows=3, columns=6)
+[red('second'), red(' line'), 'third']
+>>> history.view(rows=2, columns=6, scroll=2)
+['first', red('second')]
+"""
+
+from collections import deque
+from typing import Union
+from collections.abc import Iterable
+
+from .formatstring import FmtStr, WrapCache, fmtstr
+from .window import BaseWindow
+
+
+class Scrollback:
+    """Logical lines shown through a window of terminal rows
+
+    Lines can be strings or FmtStrs. If maxlines is given, the oldest lines
+    are dropped when more are appended. Rows are wrapped lazily through
+    wrap_cache, which can be shared between buffers."""
+
+    def __init__(
+        self,
+        lines: Iterable[Union[str, FmtStr]] = (),
+        maxlines: int | None = None,
+        wrap_cache: WrapCache | None = None,
+    ) -> None:
+        self.lines: deque[Union[str, FmtStr]] = deque(lines, maxlines)
+        self.wrap_cache = WrapCache() if wrap_cache is None else wrap_cache
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __getitem__(self, index: int) -> Union[str, FmtStr]:
+        return self.lines[index]
+
+    def __setitem__(self, index: int, line: Union[str, FmtStr]) -> None:
+        """Replaces a line, e.g. the last one while it is being edited"""
+        self.lines[index] = line
+
+    def append(self, line: Union[str, FmtStr]) -> None:
+        self.lines.append(line)
+
+    def extend(self, lines: Iterable[Union[str, FmtStr]]) -> None:
+        self.lines.extend(lines)
+
+    def clear(self) -> None:
+        self.lines.clear()
+
+    def view(self, rows: int, columns: int, scroll: int = 0) -> list[FmtStr]:
+        """Returns the rows visible in a window of rows by columns
+
+        With scroll of 0 the last row of the last line is at the bottom,
+        each increment of scroll moves the view one row further back. The
+        view stops at the first row, so it is shorter than rows only when
+        all lines take fewer rows than that."""
+        if rows <= 0:
+            return []
+        scroll = max(0, scroll)
+        wrapped = self.wrap_cache.wrap_lines(self.lines, columns, rows + scroll)
+        start = max(0, len(wrapped) - rows - scroll)
+        return wrapped[start : start + rows]
+
+    def render(
+        self,
+        window: BaseWindow,
+        scroll: int = 0,
+        cursor_pos: tuple[int, int] | None = None,
+    ) -> None:
+        """Renders the bottom of the scrollback to fill window
+
+        The cursor is placed after the last visible row by default."""
+        height, width = window.height, window.width
+        visible = self.view(height, width, scroll)
+        if cursor_pos is None:
+            cursor_pos = (min(len(visible), height - 1), 0)
+        window.render_to_terminal(visible, cursor_pos)
@@ -11,6 +11,8 @@ STYLES: Mapping[str, int] = dict(
 FG_NUMBER_TO_COLOR: Mapping[int, str] = dict(zip(FG_COLORS.values(), FG_COLORS.keys()))
 BG_NUMBER_TO_COLOR: Mapping[int, str] = dict(zip(BG_COLORS.values(), BG_COLORS.keys()))
 NUMBER_TO_STYLE = dict(zip(STYLES.values(), STYLES.keys()))
+# codes turning off a single style, 22 turns off both bold and dark
+STYLE_RESETS: Mapping[str, int] = dict(zip(STYLES, (22, 22, 23, 24, 25, 27)))
 RESET_ALL = 0
 RESET_FG = 39
 RESET_BG = 49
@@ -18,3 +20,8 @@ RESET_BG = 49
 
 def seq(num: int) -> str:
     return f"[{num}m"
+
+
+def sgr(*nums: int) -> str:
+    """A single SGR sequence setting all of nums"""
+    return "[" + ";".join(str(num) for num in nums) + "m"
@@ -0,0 +1,170 @@
+"""
+In-memory terminal for measuring and checking what windows write
+
+A VirtualTerminal is an OutputBackend that counts the bytes, writes and
+escape sequences windows send it. It can also show the screen that output
+would produce and answer the queries windows send the terminal. The
+screen is emulated with pyte, which is only imported once the screen is
+needed, so counting output doesn't require it.
+
+>>> vt = VirtualTerminal(rows=2, columns=8)
+>>> vt.write('hello'); vt.write('\\x1b[2;1Hworld')
+>>> vt.writes, vt.bytes_written, vt.escape_sequences
+(2, 16, 1)
+>>> vt.display
+['hello   ', 'world   ']
+"""
+
+import io
+import re
+from typing import TYPE_CHECKING, Optional
+
+from .window import OutputBackend
+
+if TYPE_CHECKING:
+    import pyte
+
+# DECRQM, asks whether a DEC private mode is supported
+_MODE_QUERY = re.compile(r"\x1b\[\?(\d+)\$p")
+# cursor position and status reports are answered by pyte
+_STATUS_QUERY = re.compile(r"\x1b\[[56]n")
+# the start of an escape sequence which may still become a query
+_PARTIAL_QUERY = re.compile(r"\x1b(\[[?\d]*\$?)?\Z")
+# longer than any query, and any unfinished one
+_QUERY_TAIL = 32
+
+
+class ReplyStream(io.TextIOBase):
+    """Input stream of the answers a VirtualTerminal gives to queries"""
+
+    encoding = "utf8"
+
+    def __init__(self) -> None:
+        self._buffer = ""
+
+    def add(self, data: str) -> None:
+        self._buffer += data
+
+    def readable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return False
+
+    def read(self, size: Optional[int] = -1) -> str:
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class VirtualTerminal(OutputBackend):
+    """A terminal of rows by columns which keeps its output in memory
+
+    Pass it as the backend of a window, and its in_stream as the window's
+    in_stream for windows which query the terminal. Queries for
+    synchronized output (mode 2026) are answered according to
+    synchronized_output, other modes are reported as unknown.
+
+    If emulate is False output is only counted, not kept, so there is no
+    screen and queries are not answered."""
+
+    def __init__(
+        self,
+        rows: int = 24,
+        columns: int = 80,
+        synchronized_output: bool = False,
+        emulate: bool = True,
+    ) -> None:
+        self.rows = rows
+        self.columns = columns
+        self.synchronized_output = synchronized_output
+        self.emulate = emulate
+        self.in_stream = ReplyStream()
+        self._pending: list[str] = []
+        # the end of the pending output, to find queries split across writes
+        self._tail = ""
+        self._screen: Optional["pyte.Screen"] = None
+        self._stream: Optional["pyte.Stream"] = None
+        self.reset_counts()
+
+    def reset_counts(self) -> None:
+        """Zeroes the output statistics"""
+        self.bytes_written = 0
+        self.writes = 0
+        self.flushes = 0
+        self.escape_sequences = 0
+
+    def write(self, data: str) -> None:
+        self.writes += 1
+        self.bytes_written += len(data.encode("utf8"))
+        self.escape_sequences += data.count("\x1b")
+        if not self.emulate:
+            return
+        self._pending.append(data)
+        recent = self._tail + data
+        if "\x1b" in recent and (
+            _STATUS_QUERY.search(recent) or _MODE_QUERY.search(recent)
+        ):
+            # answer in order with the rest of the output
+            self._feed()
+        else:
+            self._tail = recent[-_QUERY_TAIL:]
+
+    def flush(self) -> None:
+        self.flushes += 1
+
+    def get_size(self) -> tuple[int, int]:
+        return self.rows, self.columns
+
+    def resize(self, rows: int, columns: int) -> None:
+        self.rows, self.columns = rows, columns
+        if self._screen is not None:
+            self._feed()
+            self._screen.resize(rows, columns)
+
+    @property
+    def screen(self) -> "pyte.Screen":
+        """The pyte Screen showing everything written so far"""
+        if not self.emulate:
+            raise ValueError("VirtualTerminal created with emulate=False")
+        self._feed()
+        assert self._screen is not None
+        return self._screen
+
+    @property
+    def display(self) -> list[str]:
+        """The rows of the screen, padded to its width with spaces"""
+        return self.screen.display
+
+    @property
+    def cursor(self) -> tuple[int, int]:
+        """The (row, column) of the cursor, 0-indexed"""
+        screen = self.screen
+        return screen.cursor.y, screen.cursor.x
+
+    def _feed(self) -> None:
+        if self._stream is None:
+            import pyte
+
+            self._screen = pyte.Screen(self.columns, self.rows)
+            self._screen.write_process_input = self.in_stream.add  # type: ignore[method-assign]
+            self._stream = pyte.Stream(self._screen)
+        data = "".join(self._pending)
+        del self._pending[:]
+        # hold back an unfinished sequence until the rest of it is written
+        m = _PARTIAL_QUERY.search(data, max(0, len(data) - _QUERY_TAIL))
+        if m is not None:
+            data, self._tail = data[: m.start()], data[m.start() :]
+            self._pending.append(self._tail)
+        else:
+            self._tail = ""
+        start = 0
+        for m in _MODE_QUERY.finditer(data):
+            self._stream.feed(data[start : m.start()])
+            mode = int(m.group(1))
+            # 2 is reset, 0 is not recognized
+            value = 2 if mode == 2026 and self.synchronized_output else 0
+            self.in_stream.add("\x1b[?%d;%d$y" % (mode, value))
+            start = m.end()
+        self._stream.feed(data[start:])
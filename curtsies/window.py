@@ -15,14 +15,18 @@ from typing import (
     Union,
     List,
 )
-from collections.abc import Callable, Sequence
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from contextlib import contextmanager, nullcontext
 from types import TracebackType
 
+import io
 import logging
 import re
 import sys
 
 import blessed
+from cwcwidth import wcwidth
 
 from .formatstring import fmtstr, FmtStr
 from .formatstringarray import FSArray
@@ -33,30 +37,335 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar("T", bound="BaseWindow")
 
+# DEC private mode 2026: the terminal holds repaints between these
+BEGIN_SYNCHRONIZED_UPDATE = "\x1b[?2026h"
+END_SYNCHRONIZED_UPDATE = "\x1b[?2026l"
+
+
+def _read_cursor_position_report(in_stream: TextIO) -> tuple[int, int, str]:
+    """Reads from in_stream up to and including a cursor position report
+
+    Returns the reported 0-indexed row and column, and anything read
+    before the report."""
+
+    def retrying_read() -> str:
+        while True:
+            try:
+                c = in_stream.read(1)
+                if c == "":
+                    raise ValueError(
+                        "Stream should be blocking - shouldn't"
+                        " return ''. Returned %r so far",
+                        (resp,),
+                    )
+                return c
+            except OSError:
+                # apparently sometimes this happens: the only documented
+                # case is Terminal on a Ubuntu 17.10 VM on osx 10.13.
+                # see issue #732
+                logger.info("stdin.read(1) that should never error just errored.")
+                continue
+
+    resp = ""
+    while True:
+        c = retrying_read()
+        resp += c
+        m = re.search(
+            r"(?P<extra>.*)" r"(?P<CSI>\x1b\[|\x9b)" r"(?P<row>\d+);(?P<column>\d+)R",
+            resp,
+            re.DOTALL,
+        )
+        if m:
+            row = int(m.groupdict()["row"])
+            col = int(m.groupdict()["column"])
+            return (row - 1, col - 1, m.groupdict()["extra"])
+
+
+def _common_prefix_length(
+    a: str,
+    a_ends: Sequence[int],
+    a_atts: Sequence[object],
+    b: str,
+    b_ends: Sequence[int],
+    b_atts: Sequence[object],
+) -> int:
+    """Returns the number of leading characters with the same text and
+    attributes, given chunk end offsets and attributes of both strings"""
+    n = min(len(a), len(b))
+    lo, hi = 0, n
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    pos, i, j = 0, 0, 0
+    while pos < lo:
+        while a_ends[i] <= pos:
+            i += 1
+        while b_ends[j] <= pos:
+            j += 1
+        if a_atts[i] is not b_atts[j] and a_atts[i] != b_atts[j]:
+            return pos
+        pos = min(a_ends[i], b_ends[j])
+    return lo
+
+
+def row_diff(old: FmtStr, new: FmtStr) -> tuple[int, int] | None:
+    """Returns the start and end of the characters of new which need to be
+    written over old on the terminal to display new, or None if nothing does.
+
+    Characters outside of that range have the same text and formatting in
+    both and are displayed in the same columns.
+
+    >>> row_diff(fmtstr('12:00 ok', 'red'), fmtstr('12:01 ok', 'red'))
+    (4, 5)
+    >>> row_diff(fmtstr('ab'), fmtstr('ab', 'bold'))
+    (0, 2)
+    >>> row_diff(fmtstr('abc'), fmtstr('ab'))
+    (2, 2)
+    """
+    old_s, new_s = old.s, new.s
+    old_widths, new_widths = old.width_divides, new.width_divides
+    if old_widths is None or new_widths is None:
+        return 0, len(new_s)
+    old_ends, new_ends = old.divides[1:], new.divides[1:]
+    old_atts = [c.atts for c in old.chunks]
+    new_atts = [c.atts for c in new.chunks]
+    start = _common_prefix_length(old_s, old_ends, old_atts, new_s, new_ends, new_atts)
+    # a combining character after the prefix changes the cell before it
+    while start > 0 and (
+        (start < len(new_s) and wcwidth(new_s[start]) == 0)
+        or (start < len(old_s) and wcwidth(old_s[start]) == 0)
+    ):
+        start -= 1
+    if start == len(old_s) == len(new_s):
+        return None
+
+    suffix = 0
+    if old_widths[-1] == new_widths[-1]:
+        old_len, new_len = len(old_s), len(new_s)
+        suffix = _common_prefix_length(
+            old_s[::-1][: old_len - start],
+            [old_len - d for d in reversed(old.divides[:-1])],
+            old_atts[::-1],
+            new_s[::-1][: new_len - start],
+            [new_len - d for d in reversed(new.divides[:-1])],
+            new_atts[::-1],
+        )
+        while suffix > 0 and wcwidth(new_s[new_len - suffix]) == 0:
+            suffix -= 1
+    return start, len(new_s) - suffix
+
+
+def row_shift(
+    old: Mapping[int, FmtStr | None], new: Sequence[FmtStr]
+) -> tuple[int, int, int] | None:
+    """Returns the top and bottom rows of a region to scroll, and how many
+    rows to scroll it up (or down if negative), so that more rows of new
+    are already displayed than without scrolling. Returns None if
+    scrolling wouldn't help.
+
+    old maps rows to the lines displayed on them. Rows are matched by the
+    text of lines which appear only once in old, and each match votes for
+    the distance it moved.
+
+    >>> old = dict(enumerate(fmtstr(s) for s in ['a', 'b', 'c', 'd', 'status']))
+    >>> row_shift(old, [fmtstr(s) for s in ['b', 'c', 'd', 'e', 'status']])
+    (0, 3, 1)
+    >>> row_shift(old, [fmtstr(s) for s in ['z', 'a', 'b', 'c', 'status']])
+    (0, 3, -1)
+    >>> row_shift(old, [fmtstr(s) for s in ['a', 'b', 'x', 'd', 'status']]) is None
+    True
+    """
+    rows_by_text: dict[str, int | None] = {}
+    for row, line in old.items():
+        if not line:
+            continue
+        text = line.s if isinstance(line, FmtStr) else line
+        rows_by_text[text] = None if text in rows_by_text else row
+    votes: dict[int, list[int]] = {}
+    for row, line in enumerate(new):
+        old_row = rows_by_text.get(line.s if isinstance(line, FmtStr) else line)
+        if old_row is None:
+            continue
+        last = old[old_row]
+        if line is last or line == last:
+            votes.setdefault(old_row - row, []).append(row)
+    unshifted = len(votes.get(0, ()))
+    best = max(
+        (shift for shift in votes if shift != 0),
+        key=lambda shift: len(votes[shift]),
+        default=None,
+    )
+    if best is None or len(votes[best]) < 2 or len(votes[best]) <= unshifted:
+        return None
+    rows = votes[best]
+    if best > 0:
+        return rows[0], rows[-1] + best, best
+    return rows[0] + best, rows[-1], best
+
+
+class OutputBackend(ABC):
+    """Destination of everything a window writes, and source of its size
+
+    Windows write to their out_stream and measure the terminal with blessed
+    by default (see StreamBackend). Other backends can send the output
+    elsewhere or measure it, like curtsies.virtualterminal.VirtualTerminal.
+    When no out_stream is given, the window's blessed Terminal writes to
+    the backend too, through a BackendStream.
+    """
+
+    @abstractmethod
+    def write(self, data: str) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    @abstractmethod
+    def get_size(self) -> tuple[int, int]:
+        """Returns the number of rows and columns of the terminal"""
+
+
+class BackendStream(io.StringIO):
+    """Text stream which passes everything written to it to a backend"""
+
+    def __init__(self, backend: OutputBackend) -> None:
+        super().__init__()
+        self.backend = backend
+
+    def write(self, s: str) -> int:
+        self.backend.write(s)
+        return len(s)
+
+    def flush(self) -> None:
+        self.backend.flush()
+
+
+class StreamBackend(OutputBackend):
+    """Writes to a stream and gets the terminal size from blessed"""
+
+    def __init__(self, out_stream: IO, terminal: blessed.Terminal) -> None:
+        self.out_stream = out_stream
+        self.t = terminal
+
+    def write(self, data: str) -> None:
+        self.out_stream.write(data)
+
+    def flush(self) -> None:
+        self.out_stream.flush()
+
+    def get_size(self) -> tuple[int, int]:
+        return self.t.height, self.t.width
+
 
 class BaseWindow(ContextManager):
-    def __init__(self, out_stream: IO | None = None, hide_cursor: bool = True) -> None:
+    in_stream: TextIO
+    extra_bytes_callback: Callable[[bytes], None] | None = None
+
+    def __init__(
+        self,
+        out_stream: IO | None = None,
+        hide_cursor: bool = True,
+        diff_rows: bool = False,
+        synchronized_output: bool = False,
+        backend: OutputBackend | None = None,
+    ) -> None:
         logger.debug("-------initializing Window object %r------" % self)
         if out_stream is None:
-            out_stream = sys.__stdout__
+            out_stream = sys.__stdout__ if backend is None else BackendStream(backend)
             assert out_stream is not None
         self.t = blessed.Terminal(stream=out_stream, force_styling=True)
         self.out_stream = out_stream
+        self.backend = StreamBackend(out_stream, self.t) if backend is None else backend
         self.hide_cursor = hide_cursor
+        self.diff_rows = diff_rows
+        self.synchronized_output = synchronized_output
+        # whether the terminal answered that it supports synchronized output
+        self.synchronized_output_supported = False
+        self._frame_depth = 0
+        self._frame: list[str] = []
         self._last_lines_by_row: dict[int, FmtStr | None] = {}
         self._last_rendered_width: int | None = None
         self._last_rendered_height: int | None = None
+        # the FSArray rendered last, its generation then and its top row
+        self._last_array: FSArray | None = None
+        self._last_generation = 0
+        self._last_top_row = 0
 
     def scroll_down(self) -> None:
         logger.debug("sending scroll down message w/ cursor on bottom line")
 
         # since scroll-down only moves the screen if cursor is at bottom
-        with self.t.location(x=0, y=1000000):
-            self.write(self.t.move_down)
+        self.write(self.t.save)
+        self.write(self.t.move(1000000, 0))
+        self.write(self.t.move_down)
+        self.write(self.t.restore)
 
     def write(self, msg: str) -> None:
-        self.out_stream.write(msg)
-        self.out_stream.flush()
+        if self._frame_depth:
+            self._frame.append(msg)
+            return
+        self.backend.write(msg)
+        self.backend.flush()
+
+    @contextmanager
+    def frame(self) -> Iterator[None]:
+        """Buffers writes until the outermost frame is left,
+        then writes them to the terminal at once"""
+        self._frame_depth += 1
+        try:
+            yield
+        finally:
+            self._frame_depth -= 1
+            if not self._frame_depth:
+                if self._frame and self.synchronized_output_supported:
+                    self._frame.insert(0, BEGIN_SYNCHRONIZED_UPDATE)
+                    self._frame.append(END_SYNCHRONIZED_UPDATE)
+                self.flush_frame()
+
+    def flush_frame(self) -> None:
+        """Writes out anything buffered in the current frame"""
+        if self._frame:
+            msg = "".join(self._frame)
+            del self._frame[:]
+            self.backend.write(msg)
+            self.backend.flush()
+
+    def query_synchronized_output(self, in_stream: TextIO) -> tuple[bool, str]:
+        """Asks the terminal whether it supports synchronized output
+
+        Sends a DECRQM query for mode 2026 followed by a cursor position
+        query, which every terminal answers, so terminals that ignore
+        DECRQM don't leave us waiting. Returns whether the mode is
+        supported and anything else read before the cursor position report.
+        """
+        self.flush_frame()
+        self.write("\x1b[?2026$p\x1b[6n")
+        _, _, extra = _read_cursor_position_report(in_stream)
+        m = re.search(r"\x1b\[\?2026;(\d+)\$y", extra)
+        if m is None:
+            return False, extra
+        # 1 and 2 mean set and reset, 0 and 4 unknown and permanently reset
+        return m.group(1) in ("1", "2"), extra[: m.start()] + extra[m.end() :]
+
+    def _extra_bytes_read(self, extra: str) -> None:
+        if self.extra_bytes_callback is not None:
+            self.extra_bytes_callback(
+                # TODO how do we know that this works?
+                extra.encode(self.in_stream.encoding or "utf-8")
+            )
+        else:
+            raise ValueError(
+                (
+                    "Bytes preceding cursor position "
+                    "query response thrown out:\n%r\n"
+                    "Pass an extra_bytes_callback to "
+                    "%s to prevent this"
+                )
+                % (extra, type(self).__name__)
+            )
 
     def __enter__(self: T) -> T:
         logger.debug("running BaseWindow.__enter__")
@@ -78,9 +387,36 @@ class BaseWindow(ContextManager):
         # Changing the terminal size breaks the cache, because it
         # is unknown how the window size change affected scrolling / the cursor
         self._last_lines_by_row = {}
+        self._last_array = None
         self._last_rendered_width = width
         self._last_rendered_height = height
 
+    def _changed_rows(
+        self, array: FSArray | Sequence[FmtStr], top_row: int = 0
+    ) -> set[int] | None:
+        """Returns the rows of array changed since it was last rendered
+
+        Only known if array is the FSArray rendered last, to the same rows
+        of a screen which hasn't changed since, otherwise returns None."""
+        if (
+            isinstance(array, FSArray)
+            and array is self._last_array
+            and top_row == self._last_top_row
+            and self._last_lines_by_row
+        ):
+            return set(array.changed_rows(self._last_generation))
+        return None
+
+    def _remember_array(
+        self, array: FSArray | Sequence[FmtStr], top_row: int = 0
+    ) -> None:
+        if isinstance(array, FSArray):
+            self._last_array = array
+            self._last_generation = array.generation
+            self._last_top_row = top_row
+        else:
+            self._last_array = None
+
     def render_to_terminal(
         self, array: FSArray | list[FmtStr], cursor_pos: tuple[int, int] = (0, 0)
     ) -> int | None:
@@ -88,21 +424,21 @@ class BaseWindow(ContextManager):
 
     def get_term_hw(self) -> tuple[int, int]:
         """Returns current terminal height and width"""
-        return self.t.height, self.t.width
+        return self.backend.get_size()
 
     @property
     def width(self) -> int:
         "The current width of the terminal window"
-        return self.t.width
+        return self.get_term_hw()[1]
 
     @property
     def height(self) -> int:
         "The current width of the terminal window"
-        return self.t.height
+        return self.get_term_hw()[0]
 
     def array_from_text(self, msg: str) -> FSArray:
         """Returns a FSArray of the size of the window containing msg"""
-        rows, columns = self.t.height, self.t.width
+        rows, columns = self.get_term_hw()
         return self.array_from_text_rc(msg, rows, columns)
 
     @classmethod
@@ -121,10 +457,41 @@ class BaseWindow(ContextManager):
 
     def fmtstr_to_stdout_xform(self) -> Callable[[FmtStr], str]:
         def for_stdout(s: FmtStr) -> str:
-            return str(s)
+            return s.sgr_str() if isinstance(s, FmtStr) else str(s)
 
         return for_stdout
 
+    def _write_row(
+        self,
+        row: int,
+        line: FmtStr,
+        last: FmtStr | None,
+        width: int,
+        for_stdout: Callable[[FmtStr], str],
+    ) -> None:
+        """Writes line to a row of the terminal currently displaying last"""
+        if (
+            self.diff_rows
+            and isinstance(line, FmtStr)
+            and isinstance(last, FmtStr)
+            and line.width_divides is not None
+            and last.width_divides is not None
+        ):
+            span = row_diff(last, line)
+            if span is None:
+                return
+            start, end = span
+            self.write(self.t.move(row, line.width_at_offset(start)))
+            if end > start:
+                self.write(for_stdout(line[start:end]))
+            if end == len(line) and line.width_divides[-1] < last.width_divides[-1]:
+                self.write(self.t.clear_eol)
+            return
+        self.write(self.t.move(row, 0))
+        self.write(for_stdout(line))
+        if len(line) < width:
+            self.write(self.t.clear_eol)
+
 
 class FullscreenWindow(BaseWindow, ContextManager["FullscreenWindow"]):
     """2D-text rendering window that disappears when its context is left
@@ -142,18 +509,65 @@ class FullscreenWindow(BaseWindow, ContextManager["FullscreenWindow"]):
         its out_stream; cached writes will be inaccurate.
     """
 
-    def __init__(self, out_stream: IO | None = None, hide_cursor: bool = True) -> None:
+    def __init__(
+        self,
+        out_stream: IO | None = None,
+        hide_cursor: bool = True,
+        diff_rows: bool = False,
+        synchronized_output: bool = False,
+        in_stream: TextIO | None = None,
+        scroll_region: bool = False,
+        backend: OutputBackend | None = None,
+        extra_bytes_callback: Callable[[bytes], None] | None = None,
+    ) -> None:
         """Constructs a FullscreenWindow
 
         Args:
             out_stream (file): Defaults to sys.__stdout__
             hide_cursor (bool): Hides cursor while in context
+            diff_rows (bool): Rewrite only the changed part of each row
+            synchronized_output (bool): Wrap each frame in synchronized
+                update sequences if the terminal supports them
+            in_stream (file): Defaults to sys.__stdin__, only read to
+                detect synchronized output support
+            scroll_region (bool): When rows moved up or down since the last
+                render, scroll them with a scroll region instead of
+                rewriting them, if the terminal supports scroll regions
+            backend (OutputBackend): Where to write output and get the
+                terminal size from instead of out_stream and blessed
+            extra_bytes_callback (f(bytes) -> None): Will be called with
+                input read while detecting synchronized output support. If
+                not provided, a ValueError will be raised when this occurs.
         """
-        super().__init__(out_stream=out_stream, hide_cursor=hide_cursor)
+        super().__init__(
+            out_stream=out_stream,
+            hide_cursor=hide_cursor,
+            diff_rows=diff_rows,
+            synchronized_output=synchronized_output,
+            backend=backend,
+        )
+        if in_stream is None:
+            in_stream = sys.__stdin__
+            assert in_stream is not None
+        self.in_stream = in_stream
+        self.extra_bytes_callback = extra_bytes_callback
+        self.scroll_region = scroll_region and bool(
+            self.t.csr and self.t.ind and self.t.ri
+        )
         self.fullscreen_ctx = self.t.fullscreen()
 
     def __enter__(self) -> "FullscreenWindow":
         self.fullscreen_ctx.__enter__()
+        if self.synchronized_output:
+            with Cbreak(self.in_stream) if self.in_stream.isatty() else nullcontext():
+                supported, extra = self.query_synchronized_output(self.in_stream)
+            self.synchronized_output_supported = supported
+            if extra:
+                try:
+                    self._extra_bytes_read(extra)
+                except BaseException:
+                    self.fullscreen_ctx.__exit__(*sys.exc_info())
+                    raise
         return super().__enter__()
 
     def __exit__(
@@ -165,6 +579,32 @@ class FullscreenWindow(BaseWindow, ContextManager["FullscreenWindow"]):
         self.fullscreen_ctx.__exit__(type, value, traceback)
         super().__exit__(type, value, traceback)
 
+    def _scroll_shifted_rows(self, array: FSArray | list[FmtStr], height: int) -> None:
+        """Scrolls rows of the last rendered array to where they are in array"""
+        shift = row_shift(self._last_lines_by_row, array[:height])
+        if shift is None:
+            return
+        top, bottom, distance = shift
+        self.write(self.t.csr(top, bottom))
+        if distance > 0:
+            self.write(self.t.move(bottom, 0))
+            self.write(self.t.ind * distance)
+        else:
+            self.write(self.t.move(top, 0))
+            self.write(self.t.ri * -distance)
+        self.write(self.t.csr(0, height - 1))
+        self._last_array = None
+
+        last = self._last_lines_by_row
+        shifted = dict(last)
+        for row in range(top, bottom + 1):
+            # rows scrolled in are blank
+            if top <= row + distance <= bottom:
+                shifted[row] = last.get(row + distance)
+            else:
+                shifted[row] = fmtstr("")
+        self._last_lines_by_row = shifted
+
     def render_to_terminal(
         self, array: FSArray | list[FmtStr], cursor_pos: tuple[int, int] = (0, 0)
     ) -> None:
@@ -180,46 +620,59 @@ class FullscreenWindow(BaseWindow, ContextManager["FullscreenWindow"]):
         * If array received is of height too large,
         * render the renderable portion (no scroll)
         """
-        # TODO there's a race condition here - these height and widths are
-        # super fresh - they might change between the array being constructed
-        # and rendered
-        # Maybe the right behavior is to throw away the render
-        # in the signal handler?
-        height, width = self.height, self.width
-
-        for_stdout = self.fmtstr_to_stdout_xform()
-        if not self.hide_cursor:
-            self.write(self.t.hide_cursor)
-        if height != self._last_rendered_height or width != self._last_rendered_width:
-            self.on_terminal_size_change(height, width)
-
-        current_lines_by_row: dict[int, FmtStr | None] = {}
+        with self.frame():
+            # TODO there's a race condition here - these height and widths are
+            # super fresh - they might change between the array being constructed
+            # and rendered
+            # Maybe the right behavior is to throw away the render
+            # in the signal handler?
+            height, width = self.height, self.width
+
+            for_stdout = self.fmtstr_to_stdout_xform()
+            if not self.hide_cursor:
+                self.write(self.t.hide_cursor)
+            if (
+                height != self._last_rendered_height
+                or width != self._last_rendered_width
+            ):
+                self.on_terminal_size_change(height, width)
+            elif self.scroll_region and self._last_lines_by_row:
+                self._scroll_shifted_rows(array, height)
+
+            current_lines_by_row: dict[int, FmtStr | None] = {}
+            changed = self._changed_rows(array)
+
+            # rows which we have content for and don't require scrolling
+            for row, line in enumerate(array):
+                current_lines_by_row[row] = line
+                if changed is not None and row not in changed:
+                    continue
+                last = self._last_lines_by_row.get(row, None)
+                # rows shared with the last rendered array are unchanged
+                if line is last or line == last:
+                    continue
+                self._write_row(row, line, last, width, for_stdout)
 
-        # rows which we have content for and don't require scrolling
-        for row, line in enumerate(array):
-            current_lines_by_row[row] = line
-            if line == self._last_lines_by_row.get(row, None):
-                continue
-            self.write(self.t.move(row, 0))
-            self.write(for_stdout(line))
-            if len(line) < width:
+            # rows onscreen that we don't have content for
+            for row in range(len(array), height):
+                if self._last_lines_by_row and row not in self._last_lines_by_row:
+                    continue
+                self.write(self.t.move(row, 0))
                 self.write(self.t.clear_eol)
+                self.write(self.t.clear_bol)
+                current_lines_by_row[row] = None
 
-        # rows onscreen that we don't have content for
-        for row in range(len(array), height):
-            if self._last_lines_by_row and row not in self._last_lines_by_row:
-                continue
-            self.write(self.t.move(row, 0))
-            self.write(self.t.clear_eol)
-            self.write(self.t.clear_bol)
-            current_lines_by_row[row] = None
-
-        logger.debug("lines in last lines by row: %r" % self._last_lines_by_row.keys())
-        logger.debug("lines in current lines by row: %r" % current_lines_by_row.keys())
-        self.write(self.t.move(*cursor_pos))
-        self._last_lines_by_row = current_lines_by_row
-        if not self.hide_cursor:
-            self.write(self.t.normal_cursor)
+            logger.debug(
+                "lines in last lines by row: %r" % self._last_lines_by_row.keys()
+            )
+            logger.debug(
+                "lines in current lines by row: %r" % current_lines_by_row.keys()
+            )
+            self.write(self.t.move(*cursor_pos))
+            self._last_lines_by_row = current_lines_by_row
+            self._remember_array(array)
+            if not self.hide_cursor:
+                self.write(self.t.normal_cursor)
 
 
 class CursorAwareWindow(BaseWindow, ContextManager["CursorAwareWindow"]):
@@ -237,7 +690,7 @@ class CursorAwareWindow(BaseWindow, ContextManager["CursorAwareWindow"]):
         Only use the render_to_terminal interface for moving the cursor.
     """
 
-    in_stream: TextIO
+    cbreak: ContextManager
 
     def __init__(
         self,
@@ -246,6 +699,9 @@ class CursorAwareWindow(BaseWindow, ContextManager["CursorAwareWindow"]):
         keep_last_line: bool = False,
         hide_cursor: bool = True,
         extra_bytes_callback: Callable[[bytes], None] | None = None,
+        diff_rows: bool = False,
+        synchronized_output: bool = False,
+        backend: OutputBackend | None = None,
     ):
         """Constructs a CursorAwareWindow
 
@@ -258,8 +714,19 @@ class CursorAwareWindow(BaseWindow, ContextManager["CursorAwareWindow"]):
             extra_bytes_callback (f(bytes) -> None): Will be called with extra
                 bytes inadvertently read in get_cursor_position(). If not
                 provided, a ValueError will be raised when this occurs.
+            diff_rows (bool): Rewrite only the changed part of each row
+            synchronized_output (bool): Wrap each frame in synchronized
+                update sequences if the terminal supports them
+            backend (OutputBackend): Where to write output and get the
+                terminal size from instead of out_stream and blessed
         """
-        super().__init__(out_stream=out_stream, hide_cursor=hide_cursor)
+        super().__init__(
+            out_stream=out_stream,
+            hide_cursor=hide_cursor,
+            diff_rows=diff_rows,
+            synchronized_output=synchronized_output,
+            backend=backend,
+        )
         if in_stream is None:
             in_stream = sys.__stdin__
             assert in_stream is not None
@@ -280,10 +747,19 @@ class CursorAwareWindow(BaseWindow, ContextManager["CursorAwareWindow"]):
         self.in_get_cursor_diff = False
 
     def __enter__(self) -> "CursorAwareWindow":
-        self.cbreak = (
-            Cbreak(self.in_stream) if not self._use_blessed else self.t.cbreak()
-        )
+        if self._use_blessed:
+            self.cbreak = self.t.cbreak()
+        elif self.in_stream.isatty():
+            self.cbreak = Cbreak(self.in_stream)
+        else:
+            # e.g. answers to queries from a virtual terminal
+            self.cbreak = nullcontext()
         self.cbreak.__enter__()
+        if self.synchronized_output:
+            supported, extra = self.query_synchronized_output(self.in_stream)
+            self.synchronized_output_supported = supported
+            if extra:
+                self._extra_bytes_read(extra)
         self.top_usable_row, _ = self.get_cursor_position()
         self._orig_top_usable_row = self.top_usable_row
         logger.debug("initial top_usable_row: %d" % self.top_usable_row)
@@ -310,65 +786,18 @@ class CursorAwareWindow(BaseWindow, ContextManager["CursorAwareWindow"]):
 
         0-indexed, like blessed cursor positions"""
 
+        # the terminal must have seen everything written before the query
+        self.flush_frame()
+
         if self._use_blessed:
             return self.t.get_location()
 
-        # TODO would this be cleaner as a parameter?
-        in_stream = self.in_stream
-
         query_cursor_position = "\x1b[6n"
         self.write(query_cursor_position)
-
-        def retrying_read() -> str:
-            while True:
-                try:
-                    c = in_stream.read(1)
-                    if c == "":
-                        raise ValueError(
-                            "Stream should be blocking - shouldn't"
-                            " return ''. Returned %r so far",
-                            (resp,),
-                        )
-                    return c
-                except OSError:
-                    # apparently sometimes this happens: the only documented
-                    # case is Terminal on a Ubuntu 17.10 VM on osx 10.13.
-                    # see issue #732
-                    logger.info("stdin.read(1) that should never error just errored.")
-                    continue
-
-        resp = ""
-        while True:
-            c = retrying_read()
-            resp += c
-            m = re.search(
-                r"(?P<extra>.*)"
-                r"(?P<CSI>\x1b\[|\x9b)"
-                r"(?P<row>\d+);(?P<column>\d+)R",
-                resp,
-                re.DOTALL,
-            )
-            if m:
-                row = int(m.groupdict()["row"])
-                col = int(m.groupdict()["column"])
-                extra = m.groupdict()["extra"]
-                if extra:
-                    if self.extra_bytes_callback is not None:
-                        self.extra_bytes_callback(
-                            # TODO how do we know that this works?
-                            extra.encode(cast(TextIO, in_stream).encoding)
-                        )
-                    else:
-                        raise ValueError(
-                            (
-                                "Bytes preceding cursor position "
-                                "query response thrown out:\n%r\n"
-                                "Pass an extra_bytes_callback to "
-                                "CursorAwareWindow to prevent this"
-                            )
-                            % (extra,)
-                        )
-                return (row - 1, col - 1)
+        row, col, extra = _read_cursor_position_report(self.in_stream)
+        if extra:
+            self._extra_bytes_read(extra)
+        return (row, col)
 
     def get_cursor_vertical_diff(self) -> int:
         """Returns the how far down the cursor moved since last render.
@@ -446,70 +875,92 @@ class CursorAwareWindow(BaseWindow, ContextManager["CursorAwareWindow"]):
             and render the rest of it, then return how much we scrolled down
 
         """
-        for_stdout = self.fmtstr_to_stdout_xform()
-        # caching of write and tc (avoiding the self. lookups etc) made
-        # no significant performance difference here
-        if not self.hide_cursor:
-            self.write(self.t.hide_cursor)
-
-        # TODO race condition here?
-        height, width = self.t.height, self.t.width
-        if height != self._last_rendered_height or width != self._last_rendered_width:
-            self.on_terminal_size_change(height, width)
-
-        current_lines_by_row: dict[int, FmtStr | None] = {}
-        rows_for_use = list(range(self.top_usable_row, height))
+        with self.frame():
+            for_stdout = self.fmtstr_to_stdout_xform()
+            # caching of write and tc (avoiding the self. lookups etc) made
+            # no significant performance difference here
+            if not self.hide_cursor:
+                self.write(self.t.hide_cursor)
+
+            # TODO race condition here?
+            height, width = self.height, self.width
+            if (
+                height != self._last_rendered_height
+                or width != self._last_rendered_width
+            ):
+                self.on_terminal_size_change(height, width)
+
+            current_lines_by_row: dict[int, FmtStr | None] = {}
+            rows_for_use = list(range(self.top_usable_row, height))
+            top_row = self.top_usable_row
+            changed = self._changed_rows(array, top_row)
+
+            # rows which we have content for and don't require scrolling
+            # TODO rename shared
+            shared = min(len(array), len(rows_for_use))
+            for i, (row, line) in enumerate(zip(rows_for_use[:shared], array[:shared])):
+                current_lines_by_row[row] = line
+                if changed is not None and i not in changed:
+                    continue
+                last = self._last_lines_by_row.get(row, None)
+                # rows shared with the last rendered array are unchanged
+                if line is last or line == last:
+                    continue
+                self._write_row(row, line, last, width, for_stdout)
 
-        # rows which we have content for and don't require scrolling
-        # TODO rename shared
-        shared = min(len(array), len(rows_for_use))
-        for row, line in zip(rows_for_use[:shared], array[:shared]):
-            current_lines_by_row[row] = line
-            if line == self._last_lines_by_row.get(row, None):
-                continue
-            self.write(self.t.move(row, 0))
-            self.write(for_stdout(line))
-            if len(line) < width:
+            # rows already on screen that we don't have content for
+            rest_of_lines = array[shared:]
+            rest_of_rows = rows_for_use[shared:]
+            for row in rest_of_rows:  # if array too small
+                if self._last_lines_by_row and row not in self._last_lines_by_row:
+                    continue
+                self.write(self.t.move(row, 0))
                 self.write(self.t.clear_eol)
-
-        # rows already on screen that we don't have content for
-        rest_of_lines = array[shared:]
-        rest_of_rows = rows_for_use[shared:]
-        for row in rest_of_rows:  # if array too small
-            if self._last_lines_by_row and row not in self._last_lines_by_row:
-                continue
-            self.write(self.t.move(row, 0))
-            self.write(self.t.clear_eol)
-            # TODO probably not necessary - is first char cleared?
-            self.write(self.t.clear_bol)
-            current_lines_by_row[row] = None
-
-        # lines for which we need to scroll down to render
-        offscreen_scrolls = 0
-        for line in rest_of_lines:  # if array too big
-            self.scroll_down()
-            if self.top_usable_row > 0:
-                self.top_usable_row -= 1
+                # TODO probably not necessary - is first char cleared?
+                self.write(self.t.clear_bol)
+                current_lines_by_row[row] = None
+
+            # lines for which we need to scroll down to render
+            offscreen_scrolls = 0
+            scrolls = len(rest_of_lines)  # if array too big
+            if scrolls:
+                # a newline on the bottom row scrolls the screen up by one,
+                # so all of these lines go out in a single write
+                self.write(self.t.move(height - 1, 0))
+                self.write("".join("\r\n" + for_stdout(line) for line in rest_of_lines))
+                onscreen_scrolls = min(scrolls, max(0, self.top_usable_row))
+                self.top_usable_row -= onscreen_scrolls
+                offscreen_scrolls = scrolls - onscreen_scrolls
+                logger.debug("new top_usable_row: %d" % self.top_usable_row)
+                current_lines_by_row = {
+                    k - scrolls: v
+                    for k, v in current_lines_by_row.items()
+                    if k >= scrolls
+                }
+                first_row = height - scrolls
+                for i in range(max(0, -first_row), scrolls):
+                    current_lines_by_row[first_row + i] = rest_of_lines[i]
+
+            logger.debug(
+                "lines in last lines by row: %r" % self._last_lines_by_row.keys()
+            )
+            logger.debug(
+                "lines in current lines by row: %r" % current_lines_by_row.keys()
+            )
+            self._last_cursor_row = max(
+                0, cursor_pos[0] - offscreen_scrolls + self.top_usable_row
+            )
+            self._last_cursor_column = cursor_pos[1]
+            self.write(self.t.move(self._last_cursor_row, self._last_cursor_column))
+            self._last_lines_by_row = current_lines_by_row
+            if scrolls:
+                # rows moved up the screen
+                self._last_array = None
             else:
-                offscreen_scrolls += 1
-            current_lines_by_row = {k - 1: v for k, v in current_lines_by_row.items()}
-            logger.debug("new top_usable_row: %d" % self.top_usable_row)
-            # since scrolling moves the cursor
-            self.write(self.t.move(height - 1, 0))
-            self.write(for_stdout(line))
-            current_lines_by_row[height - 1] = line
-
-        logger.debug("lines in last lines by row: %r" % self._last_lines_by_row.keys())
-        logger.debug("lines in current lines by row: %r" % current_lines_by_row.keys())
-        self._last_cursor_row = max(
-            0, cursor_pos[0] - offscreen_scrolls + self.top_usable_row
-        )
-        self._last_cursor_column = cursor_pos[1]
-        self.write(self.t.move(self._last_cursor_row, self._last_cursor_column))
-        self._last_lines_by_row = current_lines_by_row
-        if not self.hide_cursor:
-            self.write(self.t.normal_cursor)
-        return offscreen_scrolls
+                self._remember_array(array, top_row)
+            if not self.hide_cursor:
+                self.write(self.t.normal_cursor)
+            return offscreen_scrolls
 
 
 def demo() -> None:
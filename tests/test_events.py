@@ -142,6 +142,78 @@ class TestSpecialKeys(unittest.TestCase):
         )
 
 
+class TestKeyDecoder(unittest.TestCase):
+    def test_simple(self):
+        decoder = events.KeyDecoder("utf-8")
+        self.assertEqual(decoder.next_key(b"ab"), ("a", 1))
+        self.assertEqual(decoder.next_key(b"ab", 1), ("b", 2))
+        self.assertEqual(decoder.next_key(b"ab", 2), (None, 2))
+        self.assertEqual(decoder.next_key(b"\x1b[1;9Cx"), ("<Esc+RIGHT>", 6))
+
+    def test_full(self):
+        decoder = events.KeyDecoder("utf-8")
+        self.assertEqual(decoder.next_key(b"\x1b"), ("<ESC>", 1))
+        self.assertEqual(decoder.next_key(b"\x1b", full=False), (None, 0))
+        self.assertEqual(decoder.next_key(b"\x1b["), ("<Esc+[>", 2))
+        self.assertEqual(decoder.next_key(b"\x1b[1"), ("\x1b[1", 3))
+        self.assertEqual(decoder.next_key(b"\x1b[1", full=False), (None, 0))
+        self.assertEqual(decoder.next_key(b"\xe2"), ("<Meta-b>", 1))
+        self.assertEqual(decoder.next_key(b"\xe2\x88", full=False), (None, 0))
+        self.assertEqual(decoder.next_key(b"\xe2\x88\x82"), ("∂", 3))
+
+    def test_decode(self):
+        decoder = events.KeyDecoder("utf-8", events.Keynames.CURSES)
+        self.assertEqual(
+            decoder.decode(b"a\x1b[A\xc3\x9f\x08\xc3"),
+            (["a", "KEY_UP", "ß", "KEY_BACKSPACE", "xC3"], 8),
+        )
+        self.assertEqual(decoder.decode(b"a\xc3", full=False), (["a"], 1))
+
+    def test_text_run(self):
+        decoder = events.KeyDecoder("utf-8")
+        self.assertEqual(decoder.text_run("a ß\n".encode("utf8")), ("a ß\n", 5))
+        self.assertEqual(decoder.text_run(b"ab\x1b[Acd"), ("ab", 2))
+        self.assertEqual(decoder.text_run(b"ab\x1b[Acd", 2), ("", 2))
+        self.assertEqual(decoder.text_run(b"ab\xc3", 0), ("ab", 2))
+        self.assertEqual(decoder.text_run(b"abcd", 1, 3), ("bc", 3))
+        self.assertEqual(decoder.char_keys[" "], "<SPACE>")
+        self.assertEqual(events.KeyDecoder("ascii").text_run(b"a\xe1"), ("a", 1))
+        bytes_decoder = events.KeyDecoder("utf-8", events.Keynames.BYTES)
+        self.assertEqual(bytes_decoder.text_run(b"ab"), ("", 0))
+
+    def test_paste_markers(self):
+        decoder = events.KeyDecoder("utf-8")
+        self.assertEqual(decoder.next_key(b"\x1b[20", full=False), (None, 0))
+        self.assertEqual(decoder.next_key(b"\x1b[200~"), ("\x1b[200~", 6))
+
+    def test_errors(self):
+        decoder = events.KeyDecoder("utf-8")
+        self.assertRaises(UnicodeDecodeError, decoder.next_key, b"\xe2ab")
+        self.assertRaises(
+            ValueError, events.KeyDecoder("utf16").next_key, b"\x00\xd8" * 4
+        )
+
+
+class TestPasteEvent(unittest.TestCase):
+    def test_events(self):
+        paste = events.PasteEvent({"\n": "<Ctrl-j>"})
+        paste.add_text("a\nb")
+        paste.add_key("<UP>", "\x1b[A")
+        self.assertEqual(paste.text, "a\nb\x1b[A")
+        self.assertEqual(paste.events, ["a", "<Ctrl-j>", "b", "<UP>"])
+        paste.add_text("c")
+        self.assertEqual(paste.events, ["a", "<Ctrl-j>", "b", "<UP>", "c"])
+
+    def test_append(self):
+        paste = events.PasteEvent()
+        paste.events.append("a")
+        paste.events.append("b")
+        self.assertEqual(paste.events, ["a", "b"])
+        paste.events = ["c"]
+        self.assertEqual(paste.events, ["c"])
+        self.assertEqual(paste.text, "c")
+
+
 class TestPPEvent(unittest.TestCase):
     def test(self):
         self.assertEqual(events.pp_event("a"), "a")
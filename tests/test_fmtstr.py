@@ -1,16 +1,29 @@
 import unittest
+from cwcwidth import wcswidth
 from curtsies.formatstring import (
     FmtStr,
     fmtstr,
     Chunk,
+    LRUCache,
+    WordWrapper,
+    WrapCache,
+    char_widths,
+    SGRSerializer,
+    fmtstr_cache,
+    intern_atts,
     linesplit,
     normalize_slice,
+    parse_args,
+    parse_atts,
+    str_width,
     width_aware_slice,
+    word_wrap,
 )
 from curtsies.fmtfuncs import (
     blue,
     red,
     green,
+    yellow,
     on_blue,
     on_red,
     on_green,
@@ -18,6 +31,7 @@ from curtsies.fmtfuncs import (
     blink,
     bold,
 )
+from curtsies.formatstringrope import RopeFmtStr
 from curtsies.termformatconstants import FG_COLORS
 from curtsies.formatstringarray import fsarray, FSArray, simple_format
 
@@ -79,6 +93,17 @@ class TestFmtStrParsing(unittest.TestCase):
         self.assertEqual(fmtstr("\x1b[20Ahello"), "hello")
         self.assertEqual(fmtstr("\x1b[20mhello"), "hello")
 
+    def test_multiline(self) -> None:
+        self.assertEqual(
+            fmtstr("\x1b[31mb\nc\x1b[32md\x1b[39m"), red("b\nc") + green("d")
+        )
+
+    def test_long_input(self) -> None:
+        line = "\x1b[33mdef\x1b[39m \x1b[34mf\x1b[39m():\n"
+        fs = fmtstr(line * 5000)
+        self.assertEqual(len(fs), len("def f():\n") * 5000)
+        self.assertEqual(fs[:8], yellow("def") + " " + blue("f") + "():")
+
 
 class TestImmutability(unittest.TestCase):
     def test_fmt_strings_remain_unchanged_when_used_to_construct_other_ones(
@@ -116,6 +141,19 @@ class TestFmtStrSplice(unittest.TestCase):
         )
         self.assertEqual(c.splice("asdfg", 1, 5), blue("h") + "asdfg" + red("!"))
 
+    def test_splice_at_chunk_boundary(self) -> None:
+        a = fmtstr("ab") + fmtstr("cd", "red") + fmtstr("ef", "blue")
+        self.assertEqual(a.splice("X", 2), fmtstr("ab") + "X" + red("cd") + blue("ef"))
+        self.assertEqual(a.splice("X", 2, 4), fmtstr("ab") + "X" + blue("ef"))
+        self.assertEqual(a.splice("X", 1, 5), fmtstr("a") + "X" + blue("f"))
+        self.assertEqual(a.splice("X", 6), a + "X")
+        self.assertEqual(a.splice("X", 10), a + "X")
+
+    def test_splice_negative_start(self) -> None:
+        a = green("abc") + red("def")
+        self.assertEqual(a.splice("XY", -1), a + "XY")
+        self.assertEqual(a.splice("XY", -2, 4), red("ef") + "XY")
+
     def test_splice_of_empty_fmtstr(self) -> None:
         self.assertEqual(fmtstr("ab").splice("", 1), fmtstr("ab"))
 
@@ -291,6 +329,58 @@ class TestFmtStr(unittest.TestCase):
         ]
         self.assertEqual(linesplit(text, 7), result)
 
+    def test_linesplit_whitespace(self) -> None:
+        self.assertEqual(linesplit("", 5), [])
+        self.assertEqual(linesplit("  \n ", 5), [])
+        self.assertEqual(linesplit(" a\t\nb ", 5), [fmtstr("a") + " " + "b"])
+        self.assertEqual(
+            linesplit(red("a ") + blue(" b"), 5), [red("a") + fmtstr(" ") + blue("b")]
+        )
+
+    def test_linesplit_counts_characters(self) -> None:
+        self.assertEqual(linesplit("ab\x07 cd", 3), [fmtstr("ab\x07"), fmtstr("cd")])
+        self.assertEqual(linesplit("ｈｉ ｈｉ", 5), [fmtstr("ｈｉ ｈｉ")])
+        self.assertRaises(ValueError, list, word_wrap("ab\x07 cd", 3))
+
+    def test_word_wrap(self) -> None:
+        text = red("ab") + blue("cd ef") + " ghijklm"
+        lines = word_wrap(text, 4)
+        self.assertEqual(next(lines), red("ab") + blue("cd"))
+        self.assertEqual(list(lines), [blue("ef"), fmtstr("ghij"), fmtstr("klm")])
+
+    def test_word_wrap_width_aware(self) -> None:
+        self.assertEqual(
+            list(word_wrap("ｈｉ ｈｉ", 5)), [fmtstr("ｈｉ"), fmtstr("ｈｉ")]
+        )
+        self.assertEqual(
+            list(word_wrap("aｈｉ a\u0300b", 3)),
+            [fmtstr("aｈ"), fmtstr("ｉ"), fmtstr("a\u0300b")],
+        )
+        with self.assertRaises(ValueError):
+            list(word_wrap("ｈｉ", 1))
+        with self.assertRaises(ValueError):
+            list(word_wrap("a\x07", 5))
+
+    def test_word_wrapper(self) -> None:
+        wrapper = WordWrapper(["one two", "", blue("three")])
+        self.assertEqual(
+            list(wrapper.wrap(7)),
+            [fmtstr("one two"), fmtstr(""), blue("three")],
+        )
+        words = wrapper.words(0)
+        self.assertEqual(
+            list(wrapper.wrap(3)), ["one", "two", "", blue("thr"), blue("ee")]
+        )
+        self.assertIs(wrapper.words(0), words)
+
+        wrapper[2] = "four"
+        self.assertIs(wrapper.words(0), words)
+        self.assertEqual(list(wrapper.wrap_paragraph(2, 7)), [fmtstr("four")])
+        wrapper.append("five six")
+        self.assertEqual(len(wrapper), 4)
+        self.assertEqual(wrapper[3], fmtstr("five six"))
+        self.assertEqual(list(wrapper.wrap_paragraph(3, 5)), ["five", "six"])
+
     def test_mul(self) -> None:
         self.assertEqual(fmtstr("heyhey"), fmtstr("hey") * 2)
         pass
@@ -317,6 +407,21 @@ class TestDoubleUnders(unittest.TestCase):
         self.assertTrue(fmtstr("adfs"), fmtstr("adfs"))
         self.assertTrue(fmtstr("adfs", "blue"), fmtstr("adfs", fg="blue"))
 
+    def test_equality_without_rendering(self) -> None:
+        a = red("abc") + blue("def")
+        b = red("abc") + blue("def")
+        c = red("abc") + blue("deg")
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+        self.assertIsNone(a._unicode)
+        self.assertIsNone(b._unicode)
+        self.assertIsNone(c._unicode)
+
+    def test_equality_of_different_chunks(self) -> None:
+        self.assertEqual(fmtstr("ab", bold=False), fmtstr("ab"))
+        self.assertNotEqual(red("ab"), blue("ab"))
+        self.assertEqual(fmtstr("\x1b[31ma\x1b[39m"), red("a"))
+
 
 class TestConvenience(unittest.TestCase):
     def test_fg(self) -> None:
@@ -334,12 +439,54 @@ class TestConvenience(unittest.TestCase):
         blink("asdf")
         self.assertTrue(True)
 
+    def test_extra_arguments(self) -> None:
+        self.assertEqual(red("asdf", "bold"), fmtstr("asdf", "red", "bold"))
+        self.assertEqual(red("asdf", bg="blue"), fmtstr("asdf", "red", "on_blue"))
+        self.assertEqual(red("asdf", style="blue"), blue("asdf"))
+        self.assertEqual(on_red(red("asdf")), fmtstr("asdf", "red", "on_red"))
+        self.assertRaises(ValueError, red, 5)
+
+    def test_parse_args(self) -> None:
+        self.assertEqual(
+            parse_args(("RED", "On_Blue", "Bold"), {}),
+            {"fg": 31, "bg": 44, "bold": True},
+        )
+        self.assertEqual(parse_args((), {"fg": "red", "bg": 44}), {"fg": 31, "bg": 44})
+        self.assertRaises(ValueError, parse_args, ("red", "blue"), {})
+        self.assertRaises(ValueError, parse_args, ("on_red",), {"bg": "blue"})
+        self.assertRaises(ValueError, parse_args, ("purple",), {})
+        self.assertRaises(ValueError, parse_args, (), {"fg": 41})
+        self.assertRaises(ValueError, parse_args, (), {"fg": [31]})
+        self.assertRaises(ValueError, parse_args, (), {"strike": True})
+
+    def test_parse_atts(self) -> None:
+        atts = parse_atts(("red", "bold"), {})
+        self.assertIs(atts, parse_atts((), {"fg": 31, "bold": True}))
+        self.assertIs(atts, intern_atts({"fg": 31, "bold": True}))
+        self.assertIs(parse_atts((), {"bold": 1}), parse_atts((), {"bold": True}))
+        self.assertEqual(str(fmtstr("a", bold=False)), "a")
+        self.assertEqual(str(fmtstr("a", bold=0)), "a")
+
+    def test_style_helpers(self) -> None:
+        self.assertEqual(red.keywords, {"style": "red"})
+        self.assertIs(red("a").chunks[0].atts, parse_atts((), {"fg": 31}))
+        self.assertIs(parse_atts(("on_blue",), {}), intern_atts({"bg": 44}))
+
 
 class TestSlicing(unittest.TestCase):
     def test_index(self) -> None:
         self.assertEqual(fmtstr("Hi!", "blue")[0], fmtstr("H", "blue"))
         self.assertRaises(IndexError, fmtstr("Hi!", "blue").__getitem__, 5)
 
+    def test_slice_across_chunks(self) -> None:
+        s = fmtstr("ab") + red("cd") + fmtstr("") + blue("ef")
+        self.assertEqual(s[1:5], fmtstr("b") + red("cd") + blue("e"))
+        self.assertEqual(s[2:4].chunks, [red("cd").chunks[0]])
+        self.assertEqual(s[4:], blue("ef"))
+        self.assertEqual(s[3], red("d"))
+        self.assertEqual(s.divides, [0, 2, 4, 4, 6])
+        self.assertIs(s.divides, s.divides)
+
     def test_slice(self) -> None:
         self.assertEqual(fmtstr("Hi!", "blue")[1:2], fmtstr("i", "blue"))
         self.assertEqual(fmtstr("Hi!", "blue")[1:], fmtstr("i!", "blue"))
@@ -347,6 +494,14 @@ class TestSlicing(unittest.TestCase):
         self.assertEqual(s[1:], fmtstr("mp") + " ")
         self.assertEqual(blue("a\nb")[0:1], blue("a"))
 
+    def test_empty_slice_keeps_atts(self) -> None:
+        self.assertEqual(red("ab")[1:1].chunks[0].atts, {"fg": 31})
+        s = green("ab") + red("") + blue("cd")
+        self.assertEqual(s[3:3].chunks[0].atts, {"fg": 34})
+        self.assertEqual(
+            [part.shared_atts for part in red("abba").split("b")], [{"fg": 31}] * 3
+        )
+
         # considering changing behavior so that this doesn't work
         # self.assertEqual(fmtstr('Hi!', 'blue')[15:18], fmtstr('', 'blue'))
 
@@ -480,6 +635,18 @@ class TestCharacterWidth(unittest.TestCase):
         self.assertEqual(len(fmtstr("a\u0300")), 2)
         self.assertEqual(fmtstr("a\u0300").width, 1)
 
+    def test_width_at_offset_across_chunks(self) -> None:
+        s = fmtstr("a") + red("\uff25b") + blue("c\u0300\u3000") + "d"
+        for i in range(len(s) + 1):
+            self.assertEqual(s.width_at_offset(i), wcswidth(s.s, i))
+
+    def test_width_aware_slice_across_chunks(self) -> None:
+        s = fmtstr("a") + red("\uff25b") + blue("cd")
+        self.assertEqual(s.width_aware_slice(slice(1, 4)), red("\uff25b"))
+        self.assertEqual(s.width_aware_slice(slice(2, 5)), red(" b") + blue("c"))
+        self.assertEqual(s.width_aware_slice(slice(4, 10)), blue("cd"))
+        self.assertEqual(s.width_aware_slice(slice(9, 10)), fmtstr(""))
+
 
 class TestWidthHelpers(unittest.TestCase):
     def test_combining_char_aware_slice(self) -> None:
@@ -500,12 +667,285 @@ class TestWidthHelpers(unittest.TestCase):
         self.assertEqual(width_aware_slice("aＥbc", 2, 4), " b")
         self.assertEqual(width_aware_slice("aＥbc", 0, 2), "a ")
 
+    def test_str_width(self) -> None:
+        for s in ["", "abc", " ~", "aＥbc", "a\u0300", "a\tb", "\x1b[31m", "\x7f"]:
+            self.assertEqual(str_width(s), wcswidth(s))
+
+    def test_char_widths(self) -> None:
+        self.assertEqual(char_widths(""), [])
+        self.assertEqual(char_widths("abc"), [1, 1, 1])
+        self.assertEqual(char_widths("aＥb\u0300"), [1, 2, 1, 0])
+        self.assertEqual(char_widths("a\tb"), [1, -1, 1])
+
+
+class TestRopeFmtStr(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fs = fmtstr("")
+        for i in range(200):
+            self.fs = self.fs + [red, blue, green, bold][i % 4](str(i))
+        self.rope = RopeFmtStr.from_fmtstr(self.fs)
+
+    def test_from_fmtstr(self) -> None:
+        self.assertEqual(self.rope, self.fs)
+        self.assertEqual(self.rope.chunks, self.fs.chunks)
+        self.assertEqual(len(self.rope), len(self.fs))
+        self.assertEqual(self.rope.width, self.fs.width)
+        self.assertEqual(self.rope.s, self.fs.s)
+
+    def test_slicing(self) -> None:
+        for start, stop in [(0, 1), (3, 17), (100, 400), (250, 600), (-5, -1)]:
+            self.assertEqual(self.rope[start:stop], self.fs[start:stop])
+        self.assertEqual(self.rope[500:400], fmtstr(""))
+
+    def test_splice(self) -> None:
+        rope, fs = self.rope, self.fs
+        for i in range(0, 400, 37):
+            rope = rope.splice(on_blue("xy"), i, i + 5)
+            fs = fs[:i] + on_blue("xy") + fs[i + 5 :]
+            self.assertEqual(rope, fs)
+        self.assertEqual(rope.splice("", 3), rope)
+        self.assertEqual(self.rope, self.fs)
+
+    def test_append_and_add(self) -> None:
+        self.assertEqual(self.rope.append(red("!")), self.fs + red("!"))
+        self.assertEqual(self.rope + "!", self.fs + "!")
+        self.assertEqual("!" + self.rope, "!" + self.fs)
+        self.assertEqual(blue("!") + self.rope, blue("!") + self.fs)
+        self.assertIsInstance(blue("!") + self.rope, RopeFmtStr)
+
+    def test_same_as_fmtstr(self) -> None:
+        fs = red("ab") + "c" + blue("de")
+        rope = RopeFmtStr.from_fmtstr(fs)
+
+        def parts(s: FmtStr) -> list[tuple[str, dict]]:
+            return [(c.s, dict(c.atts)) for c in s.chunks]
+
+        for start in range(-3, 8):
+            for end in [None, *range(-3, 8)]:
+                self.assertEqual(parts(rope[start:end]), parts(fs[start:end]))
+                self.assertEqual(
+                    parts(rope.splice(green("X"), start, end)),
+                    parts(fs.splice(green("X"), start, end)),
+                )
+        self.assertEqual(parts(rope[1:1]), [("", {"fg": 31})])
+        self.assertEqual(parts(rope.splice("X", -1)), parts(fs + "X"))
+        self.assertEqual(parts(rope.append("X")), parts(fs.append("X")))
+        self.assertEqual(parts(RopeFmtStr(Chunk("")).append("X")), [("X", {})])
+
+    def test_width_at_offset(self) -> None:
+        rope = RopeFmtStr.from_fmtstr(red("a") + "\uff21" + blue("bc\uff21d"))
+        fs = red("a") + "\uff21" + blue("bc\uff21d")
+        for i in range(len(fs) + 1):
+            self.assertEqual(rope.width_at_offset(i), fs.width_at_offset(i))
+
+    def test_balanced(self) -> None:
+        rope = RopeFmtStr(Chunk(""))
+        for i in range(1000):
+            rope = rope.append(red(str(i)) if i % 2 else blue(str(i)))
+        assert rope._root is not None
+        self.assertLessEqual(rope._root.height, 15)
+
+
+class TestSGRSerializer(unittest.TestCase):
+    def test_shared_attributes_not_repeated(self) -> None:
+        fs = red("a") + red("b", bold=True) + red("c")
+        self.assertEqual(fs.sgr_str(), "\x1b[31ma\x1b[1mb\x1b[22mc\x1b[0m")
+        self.assertIs(fs.sgr_str(), fs.sgr_str())
+
+    def test_unformatted(self) -> None:
+        self.assertEqual(fmtstr("abc").sgr_str(), "abc")
+        self.assertEqual(fmtstr("").sgr_str(), "")
+        self.assertEqual(fmtstr("a", bold=False).sgr_str(), "a")
+
+    def test_bold_and_dark_share_reset(self) -> None:
+        serializer = SGRSerializer()
+        self.assertEqual(
+            serializer.transition({"bold": True, "dark": True, "fg": 31}),
+            "\x1b[31;1;2m",
+        )
+        self.assertEqual(serializer.transition({"dark": True, "fg": 31}), "\x1b[22;2m")
+        self.assertEqual(serializer.transition({"fg": 32}), "\x1b[0;32m")
+        self.assertEqual(serializer.transition({"fg": 32}), "")
+        self.assertEqual(serializer.reset(), "\x1b[0m")
+        self.assertEqual(serializer.reset(), "")
+
+    def test_round_trip(self) -> None:
+        import random
+
+        rng = random.Random(0)
+        choices = [
+            {},
+            {"fg": 31},
+            {"fg": 32, "bold": True},
+            {"bg": 44},
+            {"bg": 44, "underline": True, "dark": True},
+            {"bold": True, "dark": True, "invert": True},
+            {"italic": True, "blink": True, "fg": 31},
+        ]
+        for _ in range(50):
+            fs = FmtStr(
+                *(Chunk(rng.choice("abc"), rng.choice(choices)) for _ in range(8))
+            )
+            parsed = fmtstr(fs.sgr_str())
+            self.assertEqual(
+                [(c, dict(chunk.atts)) for chunk in parsed.chunks for c in chunk.s],
+                [(c, dict(chunk.atts)) for chunk in fs.chunks for c in chunk.s],
+            )
+            self.assertLessEqual(len(fs.sgr_str()), len(str(fs)))
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction(self) -> None:
+        cache: LRUCache[str, int] = LRUCache(maxsize=3)
+        for i, key in enumerate("abcd"):
+            cache.put(key, i)
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.get("b"), 1)
+        cache.put("e", 4)
+        self.assertIn("b", cache)
+        self.assertNotIn("c", cache)
+        self.assertEqual(len(cache), 3)
+
+    def test_weight(self) -> None:
+        cache: LRUCache[str, str] = LRUCache(maxsize=10, maxweight=10)
+        cache.put("a", "a", 6)
+        cache.put("b", "b", 4)
+        self.assertEqual(cache.info().currweight, 10)
+        cache.put("c", "c", 1)
+        self.assertNotIn("a", cache)
+        cache.put("huge", "huge", 11)
+        self.assertNotIn("huge", cache)
+        self.assertEqual(cache.info().currweight, 5)
+
+    def test_configure_and_clear(self) -> None:
+        cache: LRUCache[int, int] = LRUCache(maxsize=10)
+        for i in range(10):
+            cache.put(i, i)
+        cache.get(9)
+        cache.get(10)
+        self.assertEqual((cache.info().hits, cache.info().misses), (1, 1))
+        cache.configure(maxsize=2)
+        self.assertEqual(len(cache), 2)
+        cache.configure(maxsize=0)
+        self.assertEqual(len(cache), 0)
+        cache.put(1, 1)
+        self.assertIsNone(cache.get(1))
+        cache.clear()
+        self.assertEqual(cache.info().hits, 0)
+
+    def test_fmtstr_cache(self) -> None:
+        info = fmtstr_cache.info()
+        self.addCleanup(fmtstr_cache.configure, info.maxsize, info.maxweight)
+        fmtstr_cache.clear()
+        a = fmtstr("\x1b[31mcached\x1b[39m", "bold")
+        b = fmtstr("\x1b[31mcached\x1b[39m", style="bold")
+        self.assertIs(a.chunks[0], b.chunks[0])
+        self.assertEqual(a, bold(red("cached")))
+        self.assertEqual(fmtstr_cache.info().hits, 1)
+        a.chunks.append(Chunk("!"))
+        self.assertEqual(b, bold(red("cached")))
+        self.assertNotEqual(fmtstr("cached", "blue"), a)
+        fmtstr_cache.configure(maxsize=0)
+        self.assertIsNot(fmtstr("cached", "bold"), fmtstr("cached", "bold"))
+
+
+class TestWrapCache(unittest.TestCase):
+    def test_wrap(self) -> None:
+        cache = WrapCache()
+        line = red("abcde")
+        rows = cache.wrap(line, 2)
+        self.assertEqual(rows, tuple(line.width_aware_splitlines(2)))
+        self.assertIs(cache.wrap(red("abcde"), 2), rows)
+        self.assertEqual(cache.wrap(line, 3), (red("abc"), red("de")))
+        self.assertEqual(cache.wrap("", 3), (fmtstr(""),))
+        self.assertEqual(cache.cache.info().hits, 1)
+
+    def test_wrap_lines(self) -> None:
+        cache = WrapCache()
+        lines = [fmtstr("%03d" % i) for i in range(1000)]
+        self.assertEqual(cache.wrap_lines(lines[:2], 2), ["00", "0", "00", "1"])
+        self.assertEqual(cache.wrap_lines(lines, 2, rows=3), ["8", "99", "9"])
+        self.assertEqual(len(cache.cache), 4)
+        self.assertEqual(cache.wrap_lines(lines, 2, rows=0), [])
+        self.assertEqual(len(cache.wrap_lines(lines, 80, rows=5000)), 1000)
+
+    def test_key(self) -> None:
+        cache = WrapCache()
+        cache.wrap(red("ab") + blue("c"), 2)
+        self.assertIn(((red("ab").chunks[0], blue("c").chunks[0]), 2), cache.cache)
+        self.assertIsNot(cache.wrap(red("abc"), 2), cache.wrap(blue("abc"), 2))
+        cache.wrap("abc", 2)
+        self.assertIn(("abc", 2), cache.cache)
+        cache.clear()
+        self.assertEqual(len(cache.cache), 0)
+
+    def test_eviction(self) -> None:
+        cache = WrapCache(maxsize=2)
+        for line in ["a", "b", "c"]:
+            cache.wrap(line, 2)
+        self.assertEqual(len(cache.cache), 2)
+        self.assertNotIn(("a", 2), cache.cache)
+
 
 class TestChunk(unittest.TestCase):
     def test_repr(self) -> None:
         c = Chunk("a", {"fg": 32})
         self.assertEqual(repr(c), """Chunk('a', {'fg': 32})""")
 
+    def test_hash(self) -> None:
+        self.assertEqual(hash(Chunk("a", {"fg": 32})), hash(Chunk("a", {"fg": 32})))
+        self.assertEqual(len({Chunk("a", {"fg": 32}), Chunk("a", {"fg": 32})}), 1)
+
+    def test_width(self) -> None:
+        self.assertEqual(Chunk("").width, 0)
+        self.assertEqual(Chunk("abc").width, 3)
+        self.assertEqual(Chunk("aＥb\u0300").width, 4)
+        self.assertEqual(Chunk("a\tb").raw_width, -1)
+        with self.assertRaises(ValueError):
+            Chunk("a\tb").width
+
+
+class TestFrozenAttributes(unittest.TestCase):
+    def test_interned(self) -> None:
+        a = Chunk("a", {"fg": 32, "bold": True})
+        b = Chunk("b", {"bold": True, "fg": 32})
+        self.assertIs(a.atts, b.atts)
+        self.assertIs(Chunk("a").atts, Chunk("b", {}).atts)
+        self.assertIsNot(a.atts, Chunk("a", {"fg": 32}).atts)
+
+    def test_mapping(self) -> None:
+        atts = Chunk("a", {"fg": 32, "bold": False}).atts
+        self.assertEqual(atts, {"fg": 32, "bold": False})
+        self.assertNotEqual(atts, {"fg": 32})
+        self.assertEqual(atts["fg"], 32)
+        self.assertEqual(sorted(atts), ["bold", "fg"])
+
+    def test_immutable(self) -> None:
+        atts = intern_atts({"fg": 32})
+        self.assertRaises(Exception, atts.__setitem__, "fg", 31)
+        self.assertRaises(Exception, atts.__delitem__, "fg")
+        self.assertRaises(Exception, atts.update, {"fg": 31})
+        self.assertRaises(Exception, atts.pop, "fg")
+        self.assertRaises(Exception, atts.clear)
+        self.assertEqual(atts, {"fg": 32})
+
+    def test_extend_and_remove(self) -> None:
+        atts = intern_atts({"fg": 32, "underline": True})
+        extended = atts.extend({"fg": 31, "bg": 44})
+        self.assertEqual(extended, {"fg": 31, "bg": 44, "underline": True})
+        self.assertIs(extended, intern_atts({"bg": 44, "fg": 31, "underline": True}))
+        removed = extended.remove("bg", "underline", "blink")
+        self.assertEqual(removed, {"fg": 31})
+        self.assertIs(removed, intern_atts({"fg": 31}))
+
+    def test_unusual_attributes(self) -> None:
+        atts = intern_atts({"fg": 32, "custom": 1})
+        self.assertIsNone(atts.packed)
+        self.assertEqual(atts.extend({"fg": 31}), {"fg": 31, "custom": 1})
+        self.assertIs(atts.remove("custom"), intern_atts({"fg": 32}))
+        self.assertEqual(Chunk("a", atts), Chunk("a", {"fg": 32, "custom": 1}))
+        self.assertNotEqual(Chunk("a", atts), Chunk("a", {"fg": 32}))
+
 
 class TestChunkSplitter(unittest.TestCase):
     def test_chunk_splitter(self) -> None:
@@ -569,6 +1009,59 @@ class TestFSArray(unittest.TestCase):
         self.assertEqual(normalize_slice(10, Slice[:3]), slice(0, 3, None))
         self.assertEqual(normalize_slice(11, Slice[3:]), slice(3, 11, None))
 
+    def test_copy_on_write(self) -> None:
+        a = fsarray(["abc", "def", "ghi"])
+        b = a.copy()
+        b[1, 0:1] = ["x"]
+        self.assertEqual(a[1], fmtstr("def"))
+        self.assertEqual(b[1], fmtstr("xef"))
+        self.assertIs(a[0], b[0])
+        self.assertIs(a[2], b[2])
+        a[2] = fmtstr("jkl")
+        self.assertEqual(b[2], fmtstr("ghi"))
+
+    def test_changed_rows(self) -> None:
+        a = fsarray(["abc", "def", "ghi"])
+        since = a.generation
+        self.assertEqual(a.changed_rows(since), [])
+        a[0:2, 1:2] = ["x", "e"]
+        self.assertEqual(a.changed_rows(since), [0, 1])
+        since = a.generation
+        a[4, 0:1] = ["y"]
+        self.assertEqual(a.changed_rows(since), [3, 4])
+        self.assertEqual(a.row_generation(4), a.generation)
+        since = a.generation
+        a[1] = a[1]
+        self.assertEqual(a.changed_rows(since), [])
+
+    def test_rows_view(self) -> None:
+        a = fsarray(["abc", "def"])
+        since = a.generation
+        self.assertEqual(list(a.rows), [fmtstr("abc"), fmtstr("def")])
+        self.assertEqual(a.changed_rows(since), [])
+        b = a.copy()
+        b.rows[-1] = fmtstr("xyz")
+        self.assertEqual(b.changed_rows(since), [1])
+        self.assertEqual((a[1], b[1]), (fmtstr("def"), fmtstr("xyz")))
+
+    def test_rows_like_list(self) -> None:
+        a = fsarray(["abc", "def"])
+        self.assertEqual(a.rows, list(a.rows))
+        self.assertEqual(a.rows, [fmtstr("abc"), fmtstr("def")])
+        self.assertNotEqual(a.rows, [fmtstr("abc")])
+        self.assertEqual(a.rows + [fmtstr("x")], [fmtstr("abc"), fmtstr("def"), "x"])
+        self.assertEqual([fmtstr("x")] + a.rows, ["x", fmtstr("abc"), fmtstr("def")])
+        rows = a.rows.copy()
+        rows.append(fmtstr("x"))
+        self.assertEqual(a.height, 2)
+
+    def test_mutable_rows_marks_all_changed(self) -> None:
+        a = fsarray(["abc", "def"])
+        since = a.generation
+        a.mutable_rows().append(fmtstr("ghi"))
+        self.assertEqual(a.changed_rows(since), [0, 1, 2])
+        self.assertEqual(a.height, 3)
+
     @skip("TODO")
     def test_oomerror(self) -> None:
         a = FSArray(10, 40)
@@ -1,3 +1,5 @@
+import asyncio
+import io
 import os
 import signal
 import sys
@@ -8,7 +10,7 @@ from unittest.mock import Mock
 from unittest import skip, skipUnless
 
 from curtsies import events
-from curtsies.input import Input
+from curtsies.input import AsyncInput, Input
 
 
 class CustomEvent(events.Event):
@@ -37,6 +39,27 @@ class TestInput(unittest.TestCase):
         inp.unprocessed_bytes = [b"a"]
         self.assertEqual(inp.send("nonsensical value"), "a")
 
+    def test_unget_bytes(self):
+        inp = Input()
+        inp.unget_bytes(b"a\x1b[A")
+        inp.unget_bytes("ß".encode("utf8"))
+        self.assertEqual(bytes(inp.unprocessed_bytes), b"a\x1b[A\xc3\x9f")
+        self.assertEqual(inp.send(0), "a")
+        self.assertEqual(bytes(inp.unprocessed_bytes), b"\x1b[A\xc3\x9f")
+        self.assertEqual(inp.send(0), "<UP>")
+        self.assertEqual(inp.send(0), "ß")
+        self.assertEqual(inp.unprocessed_bytes, [])
+
+    def test_unprocessed_bytes_list(self):
+        inp = Input()
+        inp.unprocessed_bytes.extend([b"a", b"b"])
+        inp.unprocessed_bytes.append(b"c")
+        self.assertEqual(inp.unprocessed_bytes, [b"a", b"b", b"c"])
+        self.assertEqual(inp.unprocessed_bytes.pop(0), b"a")
+        self.assertEqual(inp.unprocessed_bytes[-1], b"c")
+        self.assertEqual(len(inp.unprocessed_bytes), 2)
+        self.assertEqual(inp.send(0), "b")
+
     def test_send_nonblocking_no_event(self):
         inp = Input()
         inp.unprocessed_bytes = []
@@ -70,6 +93,115 @@ class TestInput(unittest.TestCase):
         self.assertEqual(type(r), events.PasteEvent)
         self.assertEqual(r.events, ["a"] * n)
 
+    def mock_reads(self, inp, *reads):
+        inp._wait_for_read_ready_or_timeout = Mock()
+        inp._wait_for_read_ready_or_timeout.return_value = (True, None)
+        remaining = list(reads)
+
+        def side_effect():
+            if not remaining:
+                return 0
+            data = remaining.pop(0)
+            inp.unget_bytes(data)
+            return len(data)
+
+        inp._nonblocking_read = Mock(side_effect=side_effect)
+
+    def test_send_paste_text(self):
+        inp = Input()
+        self.mock_reads(inp, "héllo wor".encode("utf8"), b"ld\n\x1b[A")
+        r = inp.send(0)
+        self.assertEqual(type(r), events.PasteEvent)
+        self.assertEqual(r.text, "héllo world\n\x1b[A")
+        self.assertEqual(
+            r.events,
+            list("héllo") + ["<SPACE>"] + list("world") + ["<Ctrl-j>", "<UP>"],
+        )
+
+    def test_send_paste_split_key(self):
+        inp = Input()
+        self.mock_reads(inp, b"abcdefghi\x1b[", b"A")
+        r = inp.send(0)
+        self.assertEqual(r.events, list("abcdefghi") + ["<UP>"])
+
+    def test_send_bracketed_paste(self):
+        inp = Input()
+        self.mock_reads(inp, b"\x1b[200~ab", b"c\x1b[201~d")
+        r = inp.send(0)
+        self.assertEqual(type(r), events.PasteEvent)
+        self.assertEqual(r.text, "abc")
+        self.assertEqual(inp.send(0), "d")
+
+    def test_send_bracketed_paste_after_keys(self):
+        inp = Input()
+        self.mock_reads(inp, b"abcdefghi\x1b[200~x\x1b[201~")
+        r = inp.send(0)
+        self.assertEqual(r.events, list("abcdefghi"))
+        r = inp.send(0)
+        self.assertEqual(type(r), events.PasteEvent)
+        self.assertEqual(r.events, ["x"])
+
+    def test_send_keys_before_bracketed_paste(self):
+        inp = Input(bracketed_paste=True)
+        self.mock_reads(inp, b"a\x1b[200~xyz\x1b[201~")
+        self.assertEqual(inp.send(0), "a")
+        r = inp.send(0)
+        self.assertEqual(type(r), events.PasteEvent)
+        self.assertEqual(r.events, ["x", "y", "z"])
+
+    def test_escape_before_bracketed_paste(self):
+        inp = Input(bracketed_paste=True)
+        inp.unget_bytes(b"\x1b\x1b[200~x\x1b[201~")
+        self.assertEqual(inp.send(0), "<ESC>")
+        self.assertEqual(inp.send(0).events, ["x"])
+
+    def test_send_bracketed_paste_timeout(self):
+        inp = Input()
+        self.mock_reads(inp, b"\x1b[200~ab")
+        inp._wait_for_read_ready_or_timeout.side_effect = [(True, None), (False, None)]
+        r = inp.send(0)
+        self.assertEqual(r.text, "ab")
+
+    def test_send_paste_chunks(self):
+        inp = Input(bracketed_paste=True, paste_chunk_size=10)
+        self.mock_reads(inp, b"\x1b[200~" + b"a" * 12, b"b" * 12 + b"\x1b[201~x")
+        chunks = [inp.send(0) for _ in range(3)]
+        self.assertEqual(
+            [type(chunk) for chunk in chunks], [events.PasteChunkEvent] * 3
+        )
+        self.assertEqual([chunk.final for chunk in chunks], [False, False, True])
+        self.assertEqual(
+            [chunk.text for chunk in chunks], ["a" * 10, "aabbbbbbbb", "bbbb"]
+        )
+        self.assertEqual(inp.send(0), "x")
+
+    def test_send_paste_chunk_split_key(self):
+        inp = Input(bracketed_paste=True, paste_chunk_size=10)
+        self.mock_reads(inp, b"\x1b[200~aaaaaaaa\x1b[Ab\x1b[201~")
+        first, second = inp.send(0), inp.send(0)
+        self.assertEqual(first.events, ["a"] * 8)
+        self.assertEqual(second.events, ["<UP>", "b"])
+        self.assertTrue(second.final)
+
+    def test_paste_chunk_size_too_small(self):
+        with self.assertRaises(ValueError):
+            Input(paste_chunk_size=events.MAX_KEYPRESS_SIZE)
+
+    def test_stray_paste_end(self):
+        inp = Input(bracketed_paste=True)
+        inp.unget_bytes(b"\x1b[201~a")
+        self.assertEqual(inp.send(0), "a")
+
+    def test_bracketed_paste_mode(self):
+        out = io.StringIO()
+        with Input(bracketed_paste=True, out_stream=out):
+            self.assertEqual(out.getvalue(), "\x1b[?2004h")
+        self.assertEqual(out.getvalue(), "\x1b[?2004h\x1b[?2004l")
+        out = io.StringIO()
+        with Input(out_stream=out):
+            pass
+        self.assertEqual(out.getvalue(), "")
+
     def test_event_trigger(self):
         inp = Input()
         f = inp.event_trigger(CustomEvent)
@@ -147,3 +279,107 @@ class TestInput(unittest.TestCase):
         for i in range(1000):
             with input_generator:
                 pass
+
+
+class TestAsyncInput(unittest.TestCase):
+    def setUp(self):
+        read_fd, self.write_fd = os.pipe()
+        self.in_stream = os.fdopen(read_fd)
+        self.addCleanup(self.in_stream.close)
+        self.addCleanup(os.close, self.write_fd)
+
+    def test_send(self):
+        inp = AsyncInput(in_stream=self.in_stream)
+        os.write(self.write_fd, b"a")
+        self.assertEqual(asyncio.run(inp.asend(1)), "a")
+
+    def test_send_timeout(self):
+        inp = AsyncInput(in_stream=self.in_stream)
+        self.assertEqual(asyncio.run(inp.asend(0.01)), None)
+
+    def test_async_for(self):
+        inp = AsyncInput(in_stream=self.in_stream)
+        os.write(self.write_fd, b"a")
+
+        async def first_events():
+            received = []
+            async for e in inp:
+                received.append(e)
+                if len(received) == 2:
+                    return received
+                os.write(self.write_fd, b"\x1b[A")
+
+        self.assertEqual(asyncio.run(first_events()), ["a", "<UP>"])
+
+    def test_loop_not_blocked(self):
+        inp = AsyncInput(in_stream=self.in_stream)
+
+        async def type_later():
+            await asyncio.sleep(0.01)
+            os.write(self.write_fd, b"b")
+
+        async def main():
+            typing = asyncio.create_task(type_later())
+            e = await inp.asend(1)
+            await typing
+            return e
+
+        self.assertEqual(asyncio.run(main()), "b")
+
+    def test_scheduled_event_trigger(self):
+        inp = AsyncInput(in_stream=self.in_stream)
+        f = inp.scheduled_event_trigger(CustomScheduledEvent)
+        f(when=time.time() + 0.01)
+        self.assertEqual(type(asyncio.run(inp.asend(1))), CustomScheduledEvent)
+
+    def test_event_trigger_wakes_send(self):
+        inp = AsyncInput(in_stream=self.in_stream)
+        f = inp.event_trigger(CustomEvent)
+        g = inp.scheduled_event_trigger(CustomScheduledEvent)
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.01, f)
+            first = await inp.asend(5)
+            loop.call_later(0.01, g, time.time() + 0.01)
+            return first, await inp.asend(5)
+
+        first, second = asyncio.run(main())
+        self.assertEqual(type(first), CustomEvent)
+        self.assertEqual(type(second), CustomScheduledEvent)
+
+    def test_bracketed_paste_split_across_reads(self):
+        inp = AsyncInput(in_stream=self.in_stream)
+        os.write(self.write_fd, b"\x1b[200~ab")
+
+        async def main():
+            asyncio.get_running_loop().call_later(
+                0.01, os.write, self.write_fd, b"c\x1b[201~d"
+            )
+            return await inp.asend(1), await inp.asend(1)
+
+        paste, key = asyncio.run(main())
+        self.assertEqual(type(paste), events.PasteEvent)
+        self.assertEqual(paste.text, "abc")
+        self.assertEqual(key, "d")
+
+    def test_threadsafe_event_trigger(self):
+        inp = AsyncInput(in_stream=self.in_stream)
+        f = inp.threadsafe_event_trigger(CustomEvent)
+
+        async def main():
+            threading.Timer(0.01, f).start()
+            return await inp.asend(1)
+
+        self.assertEqual(type(asyncio.run(main())), CustomEvent)
+
+    @skipUnless(sys.stdin.isatty(), "stdin must be a tty")
+    def test_sigint_event(self):
+        async def main():
+            with AsyncInput(sigint_event=True) as inp:
+                asyncio.get_running_loop().call_later(
+                    0.01, os.kill, os.getpid(), signal.SIGINT
+                )
+                return await inp.asend(1)
+
+        self.assertEqual(type(asyncio.run(main())), events.SigIntEvent)
@@ -0,0 +1,76 @@
+import unittest
+import sys
+
+from curtsies.fmtfuncs import blue, red
+from curtsies.formatstring import WrapCache, fmtstr
+from curtsies.scrollback import Scrollback
+from curtsies.window import FullscreenWindow
+from io import StringIO
+from unittest import skipIf
+
+fds_closed = not sys.stdin.isatty() or not sys.stdout.isatty()
+
+
+class FakeFullscreenWindow(FullscreenWindow):
+    width = property(lambda self: 10)
+    height = property(lambda self: 4)
+
+
+class TestScrollback(unittest.TestCase):
+    def test_view(self):
+        history = Scrollback(["abc", red("defghij"), "", "k"])
+        self.assertEqual(history.view(3, 4), [red("hij"), fmtstr(""), fmtstr("k")])
+        self.assertEqual(history.view(2, 4, scroll=2), [red("defg"), red("hij")])
+        self.assertEqual(history.view(10, 4), ["abc", red("defg"), red("hij"), "", "k"])
+        self.assertEqual(history.view(2, 4, scroll=100), ["abc", red("defg")])
+        self.assertEqual(history.view(0, 4), [])
+        self.assertEqual(Scrollback().view(3, 4), [])
+
+    def test_view_wraps_visible_lines_only(self):
+        history = Scrollback(str(i) for i in range(10000))
+        self.assertEqual(history.view(3, 80), ["9997", "9998", "9999"])
+        self.assertEqual(len(history.wrap_cache.cache), 3)
+
+    def test_rows_are_reused(self):
+        history = Scrollback(["abc", "def"])
+        first = history.view(2, 80)
+        history.append("ghi")
+        second = history.view(2, 80)
+        self.assertIs(first[1], second[0])
+
+    def test_replace_line(self):
+        history = Scrollback(["abc", "de"])
+        history.view(2, 80)
+        history[-1] = blue("def")
+        self.assertEqual(history[-1], blue("def"))
+        self.assertEqual(history.view(2, 80), ["abc", blue("def")])
+
+    def test_maxlines(self):
+        history = Scrollback(maxlines=2)
+        history.extend(["a", "b", "c"])
+        self.assertEqual(len(history), 2)
+        self.assertEqual(history.view(5, 80), ["b", "c"])
+        history.clear()
+        self.assertEqual(len(history), 0)
+
+    def test_shared_wrap_cache(self):
+        cache = WrapCache()
+        Scrollback(["abc"], wrap_cache=cache).view(1, 80)
+        Scrollback(["abc"], wrap_cache=cache).view(1, 80)
+        self.assertEqual(cache.cache.info().hits, 1)
+
+
+@skipIf(fds_closed, "blessed Terminal needs streams open")
+class TestScrollbackRender(unittest.TestCase):
+    def test_render(self):
+        stdout = StringIO()
+        window = FakeFullscreenWindow(stdout, hide_cursor=False)
+        history = Scrollback(str(i) * 5 for i in range(3))
+        history.render(window)
+        self.assertEqual(window._last_lines_by_row[2], fmtstr("22222"))
+        self.assertIsNone(window._last_lines_by_row[3])
+
+        history.extend(["3", "4"])
+        history.render(window)
+        self.assertEqual(window._last_lines_by_row[0], fmtstr("11111"))
+        self.assertEqual(window._last_lines_by_row[3], fmtstr("4"))
@@ -108,6 +108,58 @@ class TestFullscreenWindow(unittest.TestCase):
         )
 
 
+class FakeFullscreenWindow(FullscreenWindow):
+    width = property(lambda self: 10)
+    height = property(lambda self: 4)
+
+
+@skipUnless(sys.stdin.isatty(), "blessed Terminal needs streams open")
+class TestFullscreenWindowScrollRegion(unittest.TestCase):
+    def setUp(self):
+        self.screen = pyte.Screen(10, 4)
+        self.stream = pyte.Stream()
+        self.stream.attach(self.screen)
+        self.writes = []
+        stdout = ScreenStdout(self.stream)
+        write = stdout.write
+        stdout.write = lambda s: (self.writes.append(s), write(s))
+        self.window = FakeFullscreenWindow(stdout, scroll_region=True)
+
+    def render(self, lines):
+        del self.writes[:]
+        self.window.render_to_terminal(lines)
+        return "".join(self.writes)
+
+    def display(self):
+        return [row.rstrip() for row in self.screen.display]
+
+    def test_scroll_up(self):
+        self.render(["one", "two", "three", "status"])
+        output = self.render(["two", "three", "four", "status"])
+        self.assertEqual(self.display(), ["two", "three", "four", "status"])
+        self.assertIn("four", output)
+        self.assertNotIn("two", output)
+        self.assertNotIn("three", output)
+        self.assertNotIn("status", output)
+
+    def test_scroll_down(self):
+        self.render(["two", "three", "four", "status"])
+        output = self.render(["one", "two", "three", "status"])
+        self.assertEqual(self.display(), ["one", "two", "three", "status"])
+        self.assertNotIn("two", output)
+
+    def test_changed_rows_in_scrolled_region(self):
+        self.render(["1", "2", "3", "4"])
+        self.render(["2", "x", "4", "5"])
+        self.assertEqual(self.display(), ["2", "x", "4", "5"])
+
+    def test_without_shift(self):
+        self.render(["1", "2", "3", "4"])
+        output = self.render(["1", "2", "x", "4"])
+        self.assertNotIn("\x1b[1;4r", output)
+        self.assertEqual(self.display(), ["1", "2", "x", "4"])
+
+
 class NopContext:
     def __enter__(*args):
         pass
@@ -156,6 +208,56 @@ class TestCursorAwareWindow(unittest.TestCase):
             self.assertEqual(self.screen.display, ["      ", "hi    ", "there "])
 
 
+class FakeCursorAwareWindow(CursorAwareWindow):
+    width = property(lambda self: 10)
+    height = property(lambda self: 4)
+
+
+@skipUnless(sys.stdin.isatty(), "blessed Terminal needs streams open")
+class TestCursorAwareWindowScrolling(unittest.TestCase):
+    def setUp(self):
+        self.screen = Screen(10, 4)
+        self.stream = Stream()
+        self.stream.attach(self.screen)
+        self.writes = []
+        stdout = ScreenStdout(self.stream)
+        write = stdout.write
+        stdout.write = lambda s: (self.writes.append(s), write(s))
+        self.window = FakeCursorAwareWindow(out_stream=stdout, in_stream=FakeStdin())
+
+    def test_scroll_offscreen(self):
+        self.window.top_usable_row = 0
+        lines = [c * 3 for c in "abcdef"]
+        self.assertEqual(self.window.render_to_terminal(lines, (3, 3)), 2)
+        self.assertEqual(
+            [row.rstrip() for row in self.screen.display], ["ccc", "ddd", "eee", "fff"]
+        )
+        self.assertEqual(len(self.writes), 1)
+        self.assertEqual(self.window._last_lines_by_row, dict(enumerate(lines[2:])))
+        self.assertEqual(self.window._last_cursor_row, 1)
+
+        # unchanged rows are not written again after scrolling
+        self.writes.clear()
+        self.window.top_usable_row = 0
+        self.window.render_to_terminal(lines[2:] + ["ggg"])
+        self.assertNotIn("ddd", self.writes[0])
+
+    def test_scroll_into_usable_rows(self):
+        self.stream.feed("\r\n\r\n")
+        self.window.top_usable_row = 2
+        lines = ["a", "b", "c", "d"]
+        self.assertEqual(self.window.render_to_terminal(lines), 0)
+        self.assertEqual(self.window.top_usable_row, 0)
+        self.assertEqual([row.rstrip() for row in self.screen.display], lines)
+
+    def test_scroll_more_than_a_screen(self):
+        self.window.top_usable_row = 0
+        lines = [str(i) for i in range(1000)]
+        self.assertEqual(self.window.render_to_terminal(lines), 996)
+        self.assertEqual([row.rstrip() for row in self.screen.display], lines[-4:])
+        self.assertEqual(self.window._last_lines_by_row, dict(enumerate(lines[-4:])))
+
+
 @skipUnless(sys.stdin.isatty(), "blessed Terminal needs streams open")
 class TestCursorAwareWindowWithExtraInput(unittest.TestCase):
     def setUp(self):
@@ -0,0 +1,103 @@
+import unittest
+import sys
+
+from curtsies.fmtfuncs import blue, red
+from curtsies.formatstring import fmtstr
+from curtsies.virtualterminal import VirtualTerminal
+from curtsies.window import CursorAwareWindow, FullscreenWindow
+from unittest import skipIf
+
+fds_closed = not sys.stdin.isatty() or not sys.stdout.isatty()
+
+
+class TestVirtualTerminal(unittest.TestCase):
+    def test_counts(self):
+        vt = VirtualTerminal(rows=2, columns=4)
+        vt.write("ab")
+        vt.write("\x1b[31m　\x1b[39m")
+        vt.flush()
+        self.assertEqual(vt.writes, 2)
+        self.assertEqual(vt.flushes, 1)
+        self.assertEqual(vt.bytes_written, 15)
+        self.assertEqual(vt.escape_sequences, 2)
+        vt.reset_counts()
+        self.assertEqual(
+            (vt.writes, vt.flushes, vt.bytes_written, vt.escape_sequences),
+            (0, 0, 0, 0),
+        )
+
+    def test_counting_only(self):
+        vt = VirtualTerminal(emulate=False)
+        vt.write("ab\x1b[6n")
+        self.assertEqual((vt.writes, vt.bytes_written), (1, 6))
+        self.assertEqual(vt.in_stream.read(), "")
+        with self.assertRaises(ValueError):
+            vt.display
+
+    def test_screen(self):
+        vt = VirtualTerminal(rows=2, columns=4)
+        vt.write("abcdef")
+        self.assertEqual(vt.display, ["abcd", "ef  "])
+        self.assertEqual(vt.cursor, (1, 2))
+        vt.resize(3, 5)
+        self.assertEqual(vt.get_size(), (3, 5))
+        self.assertEqual(len(vt.display), 3)
+
+    def test_cursor_position_query(self):
+        vt = VirtualTerminal(rows=3, columns=10)
+        vt.write("\r\nab\x1b[6n")
+        vt.write("c\x1b[6n")
+        self.assertEqual(vt.in_stream.read(), "\x1b[2;3R\x1b[2;4R")
+        self.assertEqual(vt.in_stream.read(1), "")
+
+    def test_mode_query(self):
+        vt = VirtualTerminal(synchronized_output=True)
+        vt.write("\x1b[?2026$p\x1b[?1$p\x1b[6n")
+        self.assertEqual(vt.in_stream.read(), "\x1b[?2026;2$y\x1b[?1;0$y\x1b[1;1R")
+        vt = VirtualTerminal()
+        vt.write("\x1b[?2026$p")
+        self.assertEqual(vt.in_stream.read(), "\x1b[?2026;0$y")
+
+    def test_query_split_across_writes(self):
+        vt = VirtualTerminal(synchronized_output=True)
+        vt.write("a\x1b[?20")
+        vt.write("26$p\x1b")
+        self.assertEqual(vt.in_stream.read(), "\x1b[?2026;2$y")
+        self.assertEqual(vt.display[0][:1], "a")
+        vt.write("[6")
+        vt.write("n")
+        self.assertEqual(vt.in_stream.read(), "\x1b[1;2R")
+
+
+@skipIf(fds_closed, "blessed Terminal needs streams open")
+class TestWindowsWithVirtualTerminal(unittest.TestCase):
+    def test_fullscreen_window(self):
+        vt = VirtualTerminal(rows=3, columns=10, synchronized_output=True)
+        window = FullscreenWindow(
+            backend=vt, in_stream=vt.in_stream, synchronized_output=True
+        )
+        with window:
+            self.assertEqual(window.get_term_hw(), (3, 10))
+            self.assertTrue(window.synchronized_output_supported)
+            vt.reset_counts()
+            window.render_to_terminal([red("hi"), blue("there")])
+            self.assertEqual(vt.writes, 1)
+            self.assertEqual([row.rstrip() for row in vt.display], ["hi", "there", ""])
+            self.assertEqual(vt.screen.buffer[0][0].fg, "red")
+
+            vt.reset_counts()
+            window.render_to_terminal([red("hi"), blue("there")])
+            render_bytes = vt.bytes_written
+            window.render_to_terminal([red("hi"), blue("therE")])
+            self.assertGreater(vt.bytes_written, render_bytes)
+            self.assertEqual(vt.display[1].rstrip(), "therE")
+
+    def test_cursor_aware_window(self):
+        vt = VirtualTerminal(rows=3, columns=10)
+        vt.write("$ ls\r\n")
+        window = CursorAwareWindow(backend=vt, in_stream=vt.in_stream)
+        with window:
+            self.assertEqual(window.top_usable_row, 1)
+            window.render_to_terminal([fmtstr("a"), fmtstr("b"), fmtstr("c")])
+            self.assertEqual([row.rstrip() for row in vt.display], ["a", "b", "c"])
+            self.assertEqual(window.get_cursor_position(), (0, 0))
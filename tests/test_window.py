@@ -1,11 +1,13 @@
 import unittest
 import sys
 
-from curtsies.window import BaseWindow, FullscreenWindow, CursorAwareWindow
+from curtsies.fmtfuncs import blue, red
+from curtsies.formatstring import fmtstr
+from curtsies.formatstringarray import fsarray
+from curtsies.window import BaseWindow, FullscreenWindow, CursorAwareWindow, row_diff
 from io import StringIO
 from unittest import skipIf
 
-
 fds_closed = not sys.stdin.isatty() or not sys.stdout.isatty()
 
 
@@ -54,3 +56,126 @@ class TestBaseWindow(unittest.TestCase):
         fakestdout.seek(0)
         output = fakestdout.read()
         self.assertEqual(output.count("hello"), 3)
+
+    def test_fullscreen_render_diff_rows(self):
+        fakestdout = StringIO()
+        window = FakeFullscreenWindow(fakestdout, diff_rows=True)
+        window.render_to_terminal([fmtstr("12:00 ok"), fmtstr("hello")])
+        fakestdout.seek(0)
+        fakestdout.truncate()
+        window.render_to_terminal([fmtstr("12:01 ok"), fmtstr("hell")])
+        output = fakestdout.getvalue()
+        self.assertIn(window.t.move(0, 4) + "1", output)
+        self.assertNotIn("12:0", output)
+        self.assertIn(window.t.move(1, 4) + window.t.clear_eol, output)
+
+    def test_fullscreen_render_changed_rows_only(self):
+        fakestdout = StringIO()
+        window = FakeFullscreenWindow(fakestdout)
+        array = fsarray(["abc", "def", "ghi"])
+        window.render_to_terminal(array)
+        # rows are skipped by generation, not by looking at what was rendered
+        window._last_lines_by_row[0] = fmtstr("old")
+        array[1] = fmtstr("xyz")
+        fakestdout.seek(0)
+        fakestdout.truncate()
+        window.render_to_terminal(array)
+        output = fakestdout.getvalue()
+        self.assertIn("xyz", output)
+        self.assertNotIn("abc", output)
+        self.assertNotIn("ghi", output)
+        # other arrays are compared with what was rendered
+        window._last_lines_by_row[0] = fmtstr("old")
+        window.render_to_terminal(fsarray(["abc", "xyz", "ghi"]))
+        self.assertIn("abc", fakestdout.getvalue())
+
+    def test_render_writes_once_per_frame(self):
+        class CountingStringIO(StringIO):
+            writes = 0
+
+            def write(self, s):
+                self.writes += 1
+                return super().write(s)
+
+        fakestdout = CountingStringIO()
+        window = FakeFullscreenWindow(fakestdout)
+        window.render_to_terminal(["hello", "there"], (1, 2))
+        self.assertEqual(fakestdout.writes, 1)
+        self.assertEqual(fakestdout.getvalue().count("hello"), 1)
+        with window.frame():
+            window.render_to_terminal(["hi"])
+            window.write("!")
+            self.assertEqual(fakestdout.writes, 1)
+        self.assertEqual(fakestdout.writes, 2)
+        self.assertTrue(fakestdout.getvalue().endswith("!"))
+
+    def test_synchronized_output(self):
+        fakestdout = StringIO()
+        fakestdin = StringIO("\x1b[?2026;2$y\x1b[1;1R")
+        window = FakeFullscreenWindow(
+            fakestdout, synchronized_output=True, in_stream=fakestdin
+        )
+        with window:
+            self.assertTrue(window.synchronized_output_supported)
+            self.assertIn("\x1b[?2026$p\x1b[6n", fakestdout.getvalue())
+            fakestdout.seek(0)
+            fakestdout.truncate()
+            window.render_to_terminal(["hello"])
+            output = fakestdout.getvalue()
+        self.assertTrue(output.startswith("\x1b[?2026h"))
+        self.assertTrue(output.endswith("\x1b[?2026l"))
+        self.assertEqual(output.count("\x1b[?2026h"), 1)
+
+    def test_synchronized_output_unsupported(self):
+        fakestdout = StringIO()
+        fakestdin = StringIO("\x1b[1;1R")
+        window = FakeFullscreenWindow(
+            fakestdout, synchronized_output=True, in_stream=fakestdin
+        )
+        with window:
+            self.assertFalse(window.synchronized_output_supported)
+            window.render_to_terminal(["hello"])
+        self.assertNotIn("\x1b[?2026h", fakestdout.getvalue())
+
+    def test_synchronized_output_keeps_input(self):
+        fakestdin = StringIO("ab\x1b[?2026;2$yc\x1b[1;1R")
+        extra = []
+        window = FakeFullscreenWindow(
+            StringIO(),
+            synchronized_output=True,
+            in_stream=fakestdin,
+            extra_bytes_callback=extra.append,
+        )
+        with window:
+            self.assertTrue(window.synchronized_output_supported)
+        self.assertEqual(extra, [b"abc"])
+
+        fakestdin = StringIO("a\x1b[1;1R")
+        window = FakeFullscreenWindow(
+            StringIO(), synchronized_output=True, in_stream=fakestdin
+        )
+        with self.assertRaises(ValueError):
+            window.__enter__()
+
+
+class TestRowDiff(unittest.TestCase):
+    def test_unchanged(self):
+        self.assertIsNone(row_diff(red("abc") + "d", red("ab") + red("c") + "d"))
+
+    def test_changed_text(self):
+        self.assertEqual(row_diff(fmtstr("abcdef"), fmtstr("abXdef")), (2, 3))
+        self.assertEqual(row_diff(fmtstr("abcdef"), fmtstr("abcdefgh")), (6, 8))
+        self.assertEqual(row_diff(fmtstr("abcdef"), fmtstr("abXYdef")), (2, 7))
+        self.assertEqual(row_diff(fmtstr("aaaa"), fmtstr("aaa")), (3, 3))
+
+    def test_changed_formatting(self):
+        self.assertEqual(row_diff(fmtstr("abcdef"), red("abc") + "def"), (0, 3))
+        self.assertEqual(
+            row_diff(red("ab") + blue("cd") + "ef", red("ab") + red("cd") + "ef"),
+            (2, 4),
+        )
+
+    def test_wide_and_combining_characters(self):
+        self.assertEqual(row_diff(fmtstr("a\uff25b"), fmtstr("a\uff26b")), (1, 2))
+        self.assertEqual(row_diff(fmtstr("ab"), fmtstr("ab\u0300")), (1, 3))
+        self.assertEqual(row_diff(fmtstr("ab\u0300c"), fmtstr("abc")), (1, 2))